@@ -0,0 +1,66 @@
+import random
+import re
+import sys
+from os import path
+from timeit import repeat
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from corpus import document  # noqa: E402
+from parser import (BlockType, block_to_block_type,  # noqa: E402
+                    extract_title, markdown_to_blocks)
+
+
+def regex_chain_block_type(block: str):
+    if re.match(r"^#{1,6}\s", block):
+        return BlockType.HEADING
+    if re.match(r"^```[\S\s]+```$", block):
+        return BlockType.CODE
+    if re.match(r"^>", block):
+        return BlockType.QUOTE
+    if re.match(r"^[\*-]\s", block):
+        return BlockType.UNORDERED_LIST
+    if re.match(r"^\d+\.\s", block):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def regex_title(markdown: str):
+    return re.findall(r"^# .+", markdown)[0][2:].strip()
+
+
+def bench(func, items, number: int = 5) -> float:
+    return min(repeat(lambda: [func(i) for i in items],
+                      number=number, repeat=5)) / number
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    markdowns = [document(rng, f"Document {i}", 100, list_share=0.2,
+                          code_share=0.1, quote_share=0.1)
+                 for i in range(documents)]
+    blocks = [b for m in markdowns for b in markdown_to_blocks(m)]
+
+    assert ([regex_chain_block_type(b) for b in blocks] ==
+            [block_to_block_type(b) for b in blocks])
+    assert ([regex_title(m) for m in markdowns] ==
+            [extract_title(m) for m in markdowns])
+
+    rows = [("block typing", len(blocks),
+             bench(regex_chain_block_type, blocks),
+             bench(block_to_block_type, blocks)),
+            ("title", len(markdowns),
+             bench(regex_title, markdowns),
+             bench(extract_title, markdowns))]
+
+    print(f"{'stage':<14} {'items':>8} {'regex':>12} {'dispatch':>12} "
+          f"{'speedup':>8}")
+
+    for name, items, before, after in rows:
+        print(f"{name:<14} {items:>8} {before * 1e3:>10.2f}ms "
+              f"{after * 1e3:>10.2f}ms {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
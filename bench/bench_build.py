@@ -0,0 +1,169 @@
+import json
+import platform
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+import main as site  # noqa: E402
+from corpus import write_corpus  # noqa: E402
+from parser import (BlockType, block_to_block_type,  # noqa: E402
+                    markdown_to_blocks, markdown_to_html_node,
+                    text_to_textnodes)
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        timings.append(perf_counter() - started)
+
+    return min(timings)
+
+
+def inline_lines(documents):
+    lines = []
+
+    for markdown in documents:
+        for block in markdown_to_blocks(markdown):
+            if block_to_block_type(block) == BlockType.PARAGRAPH:
+                lines.extend(block.split("\n"))
+
+    return lines
+
+
+def run(args) -> dict:
+    shape = {"blocks": args.blocks,
+             "words": args.words,
+             "list_share": args.list_share,
+             "code_share": args.code_share,
+             "quote_share": args.quote_share,
+             "link_share": args.link_share,
+             "image_share": args.image_share}
+
+    with TemporaryDirectory() as tmp:
+        page_paths = write_corpus(tmp, args.pages, args.depth, args.seed,
+                                  **shape)
+        documents = []
+
+        for page_path in page_paths:
+            with open(page_path, 'r') as f:
+                documents.append(f.read())
+
+        lines = inline_lines(documents)
+        nodes = [markdown_to_html_node(markdown) for markdown in documents]
+        content = path.join(tmp, "content")
+        template = path.join(tmp, "template.html")
+        public = path.join(tmp, "public")
+
+        def build():
+            rmtree(public, ignore_errors=True)
+            site.configure_parse_cache()
+
+            with redirect_stdout(StringIO()):
+                site.generate_pages_recursive(content, template, public,
+                                              jobs=args.jobs,
+                                              io_threads=args.io_threads)
+
+        stages = {
+            "markdown_to_blocks": lambda: [markdown_to_blocks(markdown)
+                                           for markdown in documents],
+            "text_to_textnodes": lambda: [text_to_textnodes(line)
+                                          for line in lines],
+            "markdown_to_html_node": lambda: [markdown_to_html_node(markdown)
+                                              for markdown in documents],
+            "to_html": lambda: [node.to_html() for node in nodes],
+            "generate_pages_recursive": build,
+        }
+
+        results = {}
+
+        for name, func in stages.items():
+            seconds = best_of(args.repeat, func)
+            results[name] = {"seconds": seconds,
+                             "per_page_us": seconds / len(documents) * 1e6}
+
+    return {"python": platform.python_version(),
+            "corpus": {"pages": args.pages, "depth": args.depth,
+                       "seed": args.seed, **shape},
+            "jobs": args.jobs,
+            "io_threads": args.io_threads,
+            "stages": results}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    regressed = False
+
+    print(f"{'stage':<26} {'baseline':>10} {'current':>10} {'ratio':>7}")
+
+    for name, result in current["stages"].items():
+        before = baseline["stages"].get(name)
+
+        if before is None:
+            print(f"{name:<26} {'-':>10} {result['seconds']:>9.4f}s")
+            continue
+
+        ratio = result["seconds"] / before["seconds"]
+        flag = ""
+
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressed = True
+
+        print(f"{name:<26} {before['seconds']:>9.4f}s "
+              f"{result['seconds']:>9.4f}s {ratio:>6.2f}x{flag}")
+
+    if baseline.get("corpus") != current["corpus"]:
+        print("warning: baseline was measured on a different corpus")
+
+    return regressed
+
+
+def main():
+    arg_parser = ArgumentParser(description="Benchmark the build stages")
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--depth", type=int, default=2)
+    arg_parser.add_argument("--blocks", type=int, default=20)
+    arg_parser.add_argument("--words", type=int, default=60)
+    arg_parser.add_argument("--list-share", type=float, default=0.15)
+    arg_parser.add_argument("--code-share", type=float, default=0.05)
+    arg_parser.add_argument("--quote-share", type=float, default=0.05)
+    arg_parser.add_argument("--link-share", type=float, default=0.02)
+    arg_parser.add_argument("--image-share", type=float, default=0.01)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--jobs", type=int, default=1)
+    arg_parser.add_argument("--io-threads", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--output", help="write results as JSON here")
+    arg_parser.add_argument("--baseline", help="compare with a stored run")
+    arg_parser.add_argument("--threshold", type=float, default=0.10,
+                            help="slowdown ratio reported as a regression")
+    args = arg_parser.parse_args()
+
+    results = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
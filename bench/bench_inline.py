@@ -0,0 +1,36 @@
+import random
+import sys
+from os import path
+from timeit import repeat
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from corpus import inline_text  # noqa: E402
+from parser import scan_inline, split_text_to_textnodes  # noqa: E402
+
+def paragraph(words: int, seed: int = 0) -> str:
+    return inline_text(random.Random(seed), words, 0.05, 0.05)
+
+
+def bench(func, text: str, number: int) -> float:
+    return min(repeat(lambda: func(text), number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'words':>8} {'split passes':>14} {'single pass':>14} {'speedup':>8}")
+
+    for words in [50, 500, 5000, 50000]:
+        text = paragraph(words)
+        number = max(1, 50000 // words)
+
+        assert split_text_to_textnodes(text) == scan_inline(text)
+
+        before = bench(split_text_to_textnodes, text, number)
+        after = bench(scan_inline, text, number)
+
+        print(f"{words:>8} {before * 1e6:>12.1f}us {after * 1e6:>12.1f}us"
+              f" {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
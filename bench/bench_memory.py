@@ -0,0 +1,64 @@
+import gc
+import random
+import resource
+import sys
+import tracemalloc
+from io import StringIO
+from os import devnull, path
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from corpus import document  # noqa: E402
+from parser import (markdown_lines_to_html_node,  # noqa: E402
+                    markdown_to_html_node)
+
+
+def max_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    markdown = document(random.Random(0), "Benchmark document", blocks)
+
+    gc.collect()
+    rss_before = max_rss_mib()
+    started = perf_counter()
+    node = markdown_to_html_node(markdown)
+    elapsed = perf_counter() - started
+    rss_after = max_rss_mib()
+
+    del node
+    gc.collect()
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    _, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("filename")
+    tracemalloc.stop()
+
+    del node
+    gc.collect()
+    lines = StringIO(markdown)
+    tracemalloc.start()
+
+    with open(devnull, 'w') as f:
+        markdown_lines_to_html_node(lines).render_to(f)
+
+    _, streamed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"markdown:           {len(markdown) / 2**20:.1f} MiB, "
+          f"{blocks} blocks")
+    print(f"parse time:         {elapsed:.2f}s")
+    print(f"peak RSS:           {rss_after:.1f} MiB "
+          f"(+{rss_after - rss_before:.1f} MiB while parsing)")
+    print(f"live allocations:   {sum(stat.count for stat in stats)}")
+    print(f"retained by tree:   "
+          f"{sum(stat.size for stat in stats) / 2**20:.1f} MiB")
+    print(f"traced peak:        {peak / 2**20:.1f} MiB")
+    print(f"streamed peak:      {streamed_peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
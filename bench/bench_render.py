@@ -0,0 +1,101 @@
+import html
+import pickle
+import random
+import sys
+from os import path
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+from corpus import document  # noqa: E402
+from htmlnode import HTMLNode  # noqa: E402
+from parser import markdown_to_html_node  # noqa: E402
+
+
+def legacy_props(node: HTMLNode, escape=None) -> str:
+    props_str = ""
+
+    if node.props:
+        for key, value in node.props.items():
+            if escape is not None:
+                value = escape(value)
+
+            props_str = f'{props_str} {key}="{value}"'
+
+    return props_str
+
+
+def legacy_iter_html(node: HTMLNode, escape=None):
+    if node.children is None:
+        value = node.value if escape is None else escape(node.value, False)
+
+        if node.tag:
+            yield f"<{node.tag}{legacy_props(node, escape)}>"
+            yield value
+            yield f"</{node.tag}>"
+        else:
+            yield value
+    else:
+        yield f"<{node.tag}{legacy_props(node, escape)}>"
+
+        for c in node.children:
+            yield from legacy_iter_html(c, escape)
+
+        yield f"</{node.tag}>"
+
+
+def legacy_to_html(node: HTMLNode) -> str:
+    return "".join(legacy_iter_html(node))
+
+
+def naive_escaped_to_html(node: HTMLNode) -> str:
+    return "".join(legacy_iter_html(node, html.escape))
+
+
+def fast_to_html(node: HTMLNode) -> str:
+    return node.to_html()
+
+
+def bench(func, data: bytes, warm: bool = False, number: int = 15) -> float:
+    # Runs render a freshly loaded tree, as a build renders each node once,
+    # unless warm asks for a render beforehand to measure cached start tags
+    timings = []
+
+    for _ in range(number):
+        node = pickle.loads(data)
+
+        if warm:
+            func(node)
+
+        start = perf_counter()
+        func(node)
+        timings.append(perf_counter() - start)
+
+    return min(timings)
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    markdown = document(random.Random(0), "Large page", blocks,
+                        list_share=0.2, code_share=0.1, quote_share=0.1,
+                        link_share=0.05, image_share=0.02)
+    node = markdown_to_html_node(markdown)
+    data = pickle.dumps(node, pickle.HIGHEST_PROTOCOL)
+
+    assert naive_escaped_to_html(node) == node.to_html()
+
+    print(f"{len(markdown) / 2**20:.1f} MiB of markdown, {blocks} blocks")
+    print(f"{'renderer':<22} {'time':>10} {'vs legacy':>10}")
+    legacy = bench(legacy_to_html, data)
+
+    for name, func, warm in [
+            ("legacy, unescaped", legacy_to_html, False),
+            ("legacy + html.escape", naive_escaped_to_html, False),
+            ("fast path, escaped", fast_to_html, False),
+            ("fast path, re-render", fast_to_html, True)]:
+        elapsed = bench(func, data, warm)
+        print(f"{name:<22} {elapsed * 1e3:>8.2f}ms {legacy / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
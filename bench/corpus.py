@@ -0,0 +1,116 @@
+import random
+from os import makedirs, path
+from typing import List
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur",
+         "adipiscing", "elit", "sed", "do", "eiusmod", "tempor",
+         "incididunt", "ut", "labore", "et", "dolore", "magna", "aliqua"]
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+
+<head>
+    <title> {{ Title }} </title>
+</head>
+
+<body>
+    <article>
+        {{ Content }}
+    </article>
+</body>
+
+</html>
+"""
+
+
+def inline_text(rng: random.Random,
+                words: int,
+                link_share: float = 0.02,
+                image_share: float = 0.01) -> str:
+    parts = []
+
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+
+        if roll < link_share:
+            parts.append(f"[{word}](/{rng.choice(WORDS)})")
+        elif roll < link_share + image_share:
+            parts.append(f"![{word}](/images/{rng.choice(WORDS)}.png)")
+        elif roll < link_share + image_share + 0.04:
+            parts.append(f"**{word}**")
+        elif roll < link_share + image_share + 0.08:
+            parts.append(f"*{word}*")
+        elif roll < link_share + image_share + 0.10:
+            parts.append(f"`{word}`")
+        else:
+            parts.append(word)
+
+    return " ".join(parts)
+
+
+def document(rng: random.Random,
+             title: str,
+             blocks: int = 20,
+             words: int = 60,
+             list_share: float = 0.15,
+             code_share: float = 0.05,
+             quote_share: float = 0.05,
+             link_share: float = 0.02,
+             image_share: float = 0.01) -> str:
+    parts = [f"# {title}"]
+
+    def text(count):
+        return inline_text(rng, count, link_share, image_share)
+
+    for i in range(blocks):
+        roll = rng.random()
+
+        if i % 8 == 0:
+            parts.append(f"## {text(4)}")
+        elif roll < list_share:
+            items = [text(words // 6 + 1) for _ in range(rng.randint(2, 6))]
+
+            if rng.random() < 0.5:
+                parts.append("\n".join(f"* {item}" for item in items))
+            else:
+                parts.append("\n".join(f"{n}. {item}"
+                                       for n, item in enumerate(items, 1)))
+        elif roll < list_share + code_share:
+            lines = [f"    {rng.choice(WORDS)} = {rng.randint(0, 99)}"
+                     for _ in range(rng.randint(2, 8))]
+            parts.append("```\n" + "\n".join(lines) + "\n```")
+        elif roll < list_share + code_share + quote_share:
+            parts.append(f"> {text(words // 3 + 1)}")
+        else:
+            sentences = [text(words // 3 + 1) for _ in range(3)]
+            parts.append("\n".join(sentences))
+
+    return "\n\n".join(parts)
+
+
+def write_corpus(root: str,
+                 pages: int = 100,
+                 depth: int = 2,
+                 seed: int = 0,
+                 **shape) -> List[str]:
+    rng = random.Random(seed)
+    content_dir = path.join(root, "content")
+    page_paths = []
+
+    for i in range(pages):
+        dirs = [f"section{rng.randrange(8)}"
+                for _ in range(rng.randint(0, depth))]
+        page_dir = path.join(content_dir, *dirs, f"page{i}")
+        makedirs(page_dir, exist_ok=True)
+
+        page_path = path.join(page_dir, "index.md")
+        with open(page_path, 'w') as f:
+            f.write(document(rng, f"Page {i}", **shape))
+
+        page_paths.append(page_path)
+
+    with open(path.join(root, "template.html"), 'w') as f:
+        f.write(TEMPLATE)
+
+    return page_paths
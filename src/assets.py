@@ -0,0 +1,188 @@
+import fcntl
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from os import getpid, link as hardlink, listdir, makedirs, path, remove
+from os import replace, stat
+from shutil import copy2, copystat
+from typing import Callable, Dict, Iterator, List, TextIO, Tuple
+
+from htmlnode import rewrite_srcset
+from manifest import hash_file
+
+FICLONE = 0x40049409
+
+LINK_MODES = ["copy", "hardlink", "reflink"]
+
+ASSET_REFERENCE = re.compile(r'\b(src|href)="(/[^"]*)"|\bsrcset="([^"]*)"')
+
+
+def files_match(source: str, destiny: str, checksum: bool = False) -> bool:
+    try:
+        d = stat(destiny)
+    except FileNotFoundError:
+        return False
+
+    s = stat(source)
+
+    if s.st_ino == d.st_ino and s.st_dev == d.st_dev:
+        return True
+
+    if s.st_size != d.st_size:
+        return False
+
+    if checksum:
+        return hash_file(source) == hash_file(destiny)
+
+    return s.st_mtime_ns == d.st_mtime_ns
+
+
+def reflink(source: str, destiny: str):
+    with open(source, 'rb') as s, open(destiny, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+    copystat(source, destiny)
+
+
+def place_file(source: str, destiny: str, link: str = "copy"):
+    tmp_path = f"{destiny}.{getpid()}.tmp"
+
+    try:
+        if link == "hardlink":
+            try:
+                hardlink(source, tmp_path)
+            except OSError:
+                copy2(source, tmp_path)
+        elif link == "reflink":
+            try:
+                reflink(source, tmp_path)
+            except OSError:
+                copy2(source, tmp_path)
+        else:
+            copy2(source, tmp_path)
+
+        replace(tmp_path, destiny)
+    except BaseException:
+        if path.exists(tmp_path):
+            remove(tmp_path)
+        raise
+
+
+def write_atomic(file_path: str, data: bytes):
+    tmp_path = f"{file_path}.{getpid()}.tmp"
+
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+
+    replace(tmp_path, file_path)
+
+
+def collect_files(source: str, destiny: str) -> List[Tuple[str, str]]:
+    files = []
+
+    for d in listdir(source):
+        s = path.join(source, d)
+        d = path.join(destiny, d)
+
+        if path.isdir(s):
+            makedirs(d, exist_ok=True)
+            files.extend(collect_files(s, d))
+        else:
+            files.append((s, d))
+
+    return files
+
+
+def sync_files(files: List[Tuple[str, str]],
+               checksum: bool = False,
+               link: str = "copy",
+               jobs: int = 8) -> List[Tuple[str, str, bool]]:
+    synced = []
+    pending = []
+
+    for s, d in files:
+        if files_match(s, d, checksum):
+            synced.append((s, d, False))
+        else:
+            pending.append((s, d))
+
+    if pending:
+        with ThreadPoolExecutor(jobs) as executor:
+            for _ in executor.map(lambda p: place_file(p[0], p[1], link),
+                                  pending):
+                pass
+
+    synced.extend((s, d, True) for s, d in pending)
+
+    return synced
+
+
+def fingerprint_name(file_path: str, digest: str, length: int = 10) -> str:
+    stem, ext = path.splitext(file_path)
+
+    return f"{stem}.{digest[:length]}{ext}"
+
+
+def fingerprint_assets(static_dir_path: str,
+                       pub_dir_path: str,
+                       hash_func: Callable[[str], str] = hash_file,
+                       link: str = "copy") -> List[Tuple[str, str, str]]:
+    assets = []
+
+    for s, d in collect_files(static_dir_path, pub_dir_path):
+        rel_path = path.relpath(s, static_dir_path)
+        fingerprinted = fingerprint_name(rel_path, hash_func(d))
+        fingerprinted_path = path.join(pub_dir_path, fingerprinted)
+
+        if not path.exists(fingerprinted_path):
+            place_file(d, fingerprinted_path, link)
+
+        assets.append(("/" + rel_path.replace(path.sep, "/"),
+                       "/" + fingerprinted.replace(path.sep, "/"),
+                       fingerprinted_path))
+
+    return assets
+
+
+def write_asset_manifest(manifest_path: str, assets: Dict[str, str]):
+    write_if_changed(manifest_path, json.dumps(assets, indent=1,
+                                               sort_keys=True))
+
+
+@contextmanager
+def open_atomic(file_path: str) -> Iterator[TextIO]:
+    tmp_path = f"{file_path}.{getpid()}.tmp"
+
+    try:
+        with open(tmp_path, 'w') as f:
+            yield f
+
+        replace(tmp_path, file_path)
+    except BaseException:
+        if path.exists(tmp_path):
+            remove(tmp_path)
+        raise
+
+
+def write_if_changed(file_path: str, data: str) -> bool:
+    if path.exists(file_path):
+        with open(file_path, 'r') as f:
+            if f.read() == data:
+                return False
+
+    write_atomic(file_path, data.encode())
+
+    return True
+
+
+def rewrite_asset_urls(html: str, assets: Dict[str, str]) -> str:
+    def replace(match: re.Match) -> str:
+        if match.group(3) is not None:
+            return f'srcset="{rewrite_srcset(match.group(3), assets)}"'
+
+        url = match.group(2)
+
+        return f'{match.group(1)}="{assets.get(url, url)}"'
+
+    return ASSET_REFERENCE.sub(replace, html)
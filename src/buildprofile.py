@@ -0,0 +1,107 @@
+from contextlib import contextmanager, nullcontext
+from os import getpid
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+PAGE_STAGES = ["read", "block split", "block typing", "inline parse",
+               "render", "index", "write"]
+
+Event = Tuple[str, str, float, float, int]
+
+
+class BuildProfile():
+    def __init__(self):
+        self.events: List[Event] = []
+
+    @contextmanager
+    def stage(self, name: str, page: str = None):
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.events.append(
+                (name, page, start, perf_counter() - start, getpid()))
+
+    def extend(self, events: Iterable[Event]):
+        self.events.extend(events)
+
+    def stage_totals(self) -> Dict[str, float]:
+        totals = {}
+
+        for name, _, _, duration, _ in self.events:
+            totals[name] = totals.get(name, 0) + duration
+
+        return totals
+
+    def page_stages(self) -> Dict[str, Dict[str, float]]:
+        pages = {}
+
+        for name, page, _, duration, _ in self.events:
+            if page is not None:
+                stages = pages.setdefault(page, {})
+                stages[name] = stages.get(name, 0) + duration
+
+        return pages
+
+    def slowest_pages(self, n: int = 10) -> List[Tuple[str, float]]:
+        totals = [(page, sum(stages.values()))
+                  for page, stages in self.page_stages().items()]
+
+        return sorted(totals, key=lambda t: t[1], reverse=True)[:n]
+
+    def summary_table(self) -> str:
+        totals = self.stage_totals()
+        pages = len(self.page_stages()) or 1
+        grand_total = sum(totals.values()) or 1
+        names = [s for s in PAGE_STAGES if s in totals]
+        names.extend(s for s in totals if s not in PAGE_STAGES)
+
+        lines = [f"{'stage':<16} {'total (s)':>10} {'share':>7} "
+                 f"{'per page (ms)':>14}"]
+
+        for name in names:
+            per_page = (f"{totals[name] / pages * 1000:>14.3f}"
+                        if name in PAGE_STAGES else f"{'-':>14}")
+            lines.append(f"{name:<16} {totals[name]:>10.4f} "
+                         f"{totals[name] / grand_total:>6.1%} {per_page}")
+
+        return "\n".join(lines)
+
+    def slowest_table(self, n: int = 10) -> str:
+        lines = [f"{'page':<60} {'total (ms)':>10}"]
+
+        for page, total in self.slowest_pages(n):
+            lines.append(f"{page:<60} {total * 1000:>10.3f}")
+
+        return "\n".join(lines)
+
+    def to_json(self) -> Dict:
+        return {"stages": self.stage_totals(), "pages": self.page_stages()}
+
+    def chrome_trace(self) -> Dict:
+        origin = min((start for _, _, start, _, _ in self.events), default=0)
+        trace_events = []
+
+        for name, page, start, duration, pid in self.events:
+            event = {"name": name,
+                     "cat": "page" if page is not None else "build",
+                     "ph": "X",
+                     "ts": (start - origin) * 1e6,
+                     "dur": duration * 1e6,
+                     "pid": pid,
+                     "tid": pid}
+
+            if page is not None:
+                event["args"] = {"page": page}
+
+            trace_events.append(event)
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def stage(profile: BuildProfile, name: str, page: str = None):
+    if profile is None:
+        return nullcontext()
+
+    return profile.stage(name, page)
@@ -0,0 +1,94 @@
+import hashlib
+import pickle
+from collections import OrderedDict
+from os import getpid, makedirs, path, replace
+from typing import Callable
+
+from htmlnode import HTMLNode
+from manifest import hash_file
+from parser import markdown_to_html_node
+
+PARSER_MODULES = ["htmlnode.py", "leafnode.py", "parentnode.py", "parser.py",
+                  "textnode.py"]
+
+
+def parser_version(src_dir_path: str = path.dirname(path.abspath(__file__))):
+    digest = hashlib.sha256()
+
+    for name in PARSER_MODULES:
+        digest.update(hash_file(path.join(src_dir_path, name)).encode())
+
+    return digest.hexdigest()
+
+
+class ParseCache():
+    def __init__(self,
+                 max_entries: int = 256,
+                 cache_dir: str = None,
+                 version: str = None,
+                 parse: Callable[[str], HTMLNode] = markdown_to_html_node):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.version = version or parser_version()
+        self.hits = 0
+        self.misses = 0
+        self._parse = parse
+        self._entries: OrderedDict[str, HTMLNode] = OrderedDict()
+
+    def key(self, markdown: str) -> str:
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(markdown.encode())
+
+        return digest.hexdigest()
+
+    def parse(self, markdown: str,
+              parse: Callable[[str], HTMLNode] = None) -> HTMLNode:
+        key = self.key(markdown)
+        node = self._entries.get(key)
+
+        if node is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return node
+
+        node = self._load(key)
+
+        if node is None:
+            self.misses += 1
+            node = (parse or self._parse)(markdown)
+            self._store(key, node)
+        else:
+            self.hits += 1
+
+        self._entries[key] = node
+
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return node
+
+    def _entry_path(self, key: str) -> str:
+        return path.join(self.cache_dir, key[:2], f"{key}.pickle")
+
+    def _load(self, key: str) -> HTMLNode:
+        if self.cache_dir is None:
+            return None
+
+        try:
+            with open(self._entry_path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key: str, node: HTMLNode):
+        if self.cache_dir is None:
+            return
+
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{getpid()}.tmp"
+        makedirs(path.dirname(entry_path), exist_ok=True)
+
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(node, f, pickle.HIGHEST_PROTOCOL)
+
+        replace(tmp_path, entry_path)
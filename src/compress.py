@@ -0,0 +1,67 @@
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from os import path, walk
+from typing import List, Tuple
+
+from assets import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt",
+                ".map"}
+
+
+def is_compressible(file_path: str, min_size: int = 256) -> bool:
+    return (path.splitext(file_path)[1] in COMPRESSIBLE and
+            path.getsize(file_path) >= min_size)
+
+
+def variant_paths(file_path: str) -> List[str]:
+    variants = [f"{file_path}.gz"]
+
+    if brotli is not None:
+        variants.append(f"{file_path}.br")
+
+    return variants
+
+
+def compress_file(file_path: str, level: int = 9) -> List[str]:
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    written = [f"{file_path}.gz"]
+    write_atomic(written[0], gzip.compress(data, level, mtime=0))
+
+    if brotli is not None:
+        written.append(f"{file_path}.br")
+        write_atomic(written[1], brotli.compress(data, quality=11))
+
+    return written
+
+
+def collect_compressible(root: str, min_size: int = 256) -> List[str]:
+    files = []
+
+    for dir_path, _, names in walk(root):
+        for name in names:
+            file_path = path.join(dir_path, name)
+
+            if is_compressible(file_path, min_size):
+                files.append(file_path)
+
+    return sorted(files)
+
+
+def compress_files(files: List[str],
+                   jobs: int = 8,
+                   level: int = 9) -> List[Tuple[str, List[str]]]:
+    if not files:
+        return []
+
+    with ThreadPoolExecutor(jobs) as executor:
+        return list(zip(files,
+                        executor.map(lambda f: compress_file(f, level),
+                                     files)))
@@ -0,0 +1,182 @@
+import json
+import posixpath
+from os import makedirs, path
+from typing import Dict, Iterable, List, Tuple
+
+from parser import extract_markdown_images, extract_markdown_links
+
+EXTERNAL_SCHEMES = ("http:", "https:", "mailto:", "ftp:", "//")
+
+
+def internal_urls(references: Iterable[Tuple[str, str]]) -> List[str]:
+    urls = []
+
+    for _, url in references:
+        url = url.strip()
+
+        if url and not url.startswith(EXTERNAL_SCHEMES + ("#",)):
+            urls.append(url)
+
+    return sorted(set(urls))
+
+
+def page_links(markdown: str) -> List[str]:
+    return internal_urls(extract_markdown_links(markdown))
+
+
+def page_images(markdown: str) -> List[str]:
+    return internal_urls(extract_markdown_images(markdown))
+
+
+def output_url(output: str, pub_dir_path: str) -> str:
+    rel_path = path.relpath(output, pub_dir_path).replace(path.sep, "/")
+
+    if rel_path == "index.html":
+        return "/"
+
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("/index.html")]
+
+    return "/" + rel_path
+
+
+def resolve_url(url: str, base_url: str) -> str:
+    url = url.split("#", 1)[0].split("?", 1)[0]
+
+    if not url.startswith("/"):
+        base_dir = base_url if base_url.endswith("/") else base_url + "/"
+        url = posixpath.join(base_dir, url)
+
+    url = posixpath.normpath(url)
+
+    return url if url != "." else "/"
+
+
+class DependencyGraph():
+    def __init__(self, graph_path: str, pub_dir_path: str):
+        self.path = graph_path
+        self.pub_dir_path = pub_dir_path
+        self.outputs: Dict[str, Dict] = {}
+
+        if path.exists(graph_path):
+            with open(graph_path, 'r') as f:
+                self.outputs = json.load(f).get("outputs", {})
+
+    def add(self, output: str, source: str, template: str,
+            inputs: Iterable[str] = (), links: Iterable[str] = (),
+            images: Iterable[str] = ()):
+        self.outputs[output] = {"source": source,
+                                "template": template,
+                                "inputs": sorted(inputs),
+                                "links": sorted(links),
+                                "images": sorted(images)}
+
+    def update_links(self, output: str, links: Iterable[str],
+                     images: Iterable[str] = ()):
+        if output in self.outputs:
+            self.outputs[output]["links"] = sorted(links)
+            self.outputs[output]["images"] = sorted(images)
+
+    def remove(self, output: str):
+        self.outputs.pop(output, None)
+
+    def retain(self, outputs: Iterable[str]):
+        outputs = set(outputs)
+
+        for output in list(self.outputs):
+            if output not in outputs:
+                del self.outputs[output]
+
+    def dependencies(self, output: str) -> List[str]:
+        entry = self.outputs.get(output)
+
+        if entry is None:
+            return []
+
+        return [entry["source"], entry["template"], *entry["inputs"]]
+
+    def dependents(self, file_path: str) -> List[str]:
+        return sorted(o for o in self.outputs
+                      if file_path in self.dependencies(o))
+
+    def affected(self, changed: Iterable[str]) -> List[str]:
+        changed = set(changed)
+
+        return sorted(o for o in self.outputs
+                      if changed.intersection(self.dependencies(o)))
+
+    def resolve_link(self, output: str, url: str,
+                     base_url: str = None) -> str:
+        target = resolve_url(url, base_url or output_url(output,
+                                                         self.pub_dir_path))
+        rel_path = target.lstrip("/")
+
+        for candidate in (posixpath.join(rel_path, "index.html"),
+                          f"{rel_path}.html", rel_path):
+            candidate_path = path.join(self.pub_dir_path,
+                                       *candidate.split("/"))
+
+            if candidate_path in self.outputs:
+                return candidate_path
+
+        return None
+
+    def links_to(self, output: str) -> List[str]:
+        entry = self.outputs.get(output)
+
+        if entry is None:
+            return []
+
+        base_url = output_url(output, self.pub_dir_path)
+        targets = (self.resolve_link(output, url, base_url)
+                   for url in entry["links"])
+
+        return sorted({t for t in targets if t is not None})
+
+    def reverse_links(self) -> Dict[str, List[str]]:
+        linked_from = {}
+
+        for o in sorted(self.outputs):
+            for target in self.links_to(o):
+                linked_from.setdefault(target, []).append(o)
+
+        return linked_from
+
+    def linked_from(self, output: str) -> List[str]:
+        return self.reverse_links().get(output, [])
+
+    def output_for(self, file_path: str) -> str:
+        if file_path in self.outputs:
+            return file_path
+
+        for output, entry in self.outputs.items():
+            if entry["source"] == file_path:
+                return output
+
+        return None
+
+    def describe(self, file_path: str) -> List[str]:
+        lines = []
+        output = self.output_for(file_path)
+
+        if output is not None:
+            lines.append(output)
+            lines.extend(f"  depends on {d}"
+                         for d in self.dependencies(output))
+            lines.extend(f"  links to {o}" for o in self.links_to(output))
+            lines.extend(f"  linked from {o}"
+                         for o in self.linked_from(output))
+
+        dependents = [o for o in self.dependents(file_path) if o != output]
+
+        if dependents:
+            lines.append(file_path)
+            lines.extend(f"  used by {o}" for o in dependents)
+
+        return lines
+
+    def save(self):
+        makedirs(path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            json.dump({"outputs": self.outputs}, f, indent=1, sort_keys=True)
@@ -1,9 +1,64 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Callable, Dict, List, TextIO
+
+COMMON_TAGS = ["a", "b", "blockquote", "code", "div", "em", "h1", "h2", "h3",
+               "h4", "h5", "h6", "i", "img", "li", "ol", "p", "pre", "span",
+               "strong", "ul"]
+
+START_TAGS = {tag: f"<{tag}>" for tag in COMMON_TAGS}
+END_TAGS = {tag: f"</{tag}>" for tag in COMMON_TAGS}
+
+URL_ATTRIBUTES = {"href", "src"}
+
+url_map: Dict[str, str] = {}
+
+
+def set_url_map(urls: Dict[str, str]):
+    global url_map
+    url_map = urls
+
+
+def rewrite_srcset(srcset: str, urls: Dict[str, str]) -> str:
+    candidates = []
+
+    for candidate in srcset.split(","):
+        url, _, descriptor = candidate.strip().partition(" ")
+        url = urls.get(url, url)
+        candidates.append(f"{url} {descriptor}" if descriptor else url)
+
+    return ", ".join(candidates)
+
+
+def escape_text(text: str) -> str:
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+
+    return text
+
+
+def escape_attribute(value: str) -> str:
+    value = escape_text(value)
+
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+
+    return value
+
+
+def end_tag(tag: str) -> str:
+    return END_TAGS.get(tag) or f"</{tag}>"
 
 
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props", "_start_tag")
+
     def __init__(self,
                  tag: str = None,
                  value: str = None,
@@ -13,15 +68,52 @@ class HTMLNode():
         self.value = value
         self.children = children
         self.props = props
+        self._start_tag = None
 
-    def to_html(self):
+    def write_html(self, write: Callable[[str], object]):
         raise NotImplementedError()
 
+    def render_to(self, writer: TextIO):
+        self.write_html(writer.write)
+
+    def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+
+        return "".join(parts)
+
+    def start_tag(self) -> str:
+        # Props are not expected to change once a node has been rendered
+        start = self._start_tag
+
+        if start is None:
+            if self.props:
+                start = f"<{self.tag}{self.props_to_html()}>"
+            else:
+                start = START_TAGS.get(self.tag) or f"<{self.tag}>"
+
+            self._start_tag = start
+
+        return start
+
     def props_to_html(self):
         props_str = ""
 
         if self.props:
             for key, value in self.props.items():
+                if not isinstance(value, str):
+                    value = str(value)
+
+                if url_map:
+                    if key in URL_ATTRIBUTES:
+                        value = url_map.get(value, value)
+                    elif key == "srcset":
+                        value = rewrite_srcset(value, url_map)
+
+                if ("&" in value or "<" in value or ">" in value or
+                        '"' in value):
+                    value = escape_attribute(value)
+
                 props_str = f'{props_str} {key}="{value}"'
 
         return props_str
@@ -0,0 +1,195 @@
+import json
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from os import getpid, makedirs, path, replace
+from typing import Callable, Dict, List, Tuple
+
+from assets import (collect_files, fingerprint_name, place_file,
+                    write_if_changed)
+from manifest import hash_file
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+WIDTHS = [480, 960, 1440]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA,
+                    0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def is_image(file_path: str) -> bool:
+    return path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def image_size(file_path: str) -> Tuple[int, int]:
+    with open(file_path, 'rb') as f:
+        header = f.read(26)
+
+        if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+
+        if header[:2] == b"\xff\xd8":
+            f.seek(2)
+            return jpeg_size(f)
+
+    if Image is not None:
+        with Image.open(file_path) as image:
+            return image.size
+
+    return None
+
+
+def jpeg_size(f) -> Tuple[int, int]:
+    while True:
+        marker = f.read(2)
+
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        while marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+
+        length = f.read(2)
+
+        if len(length) < 2:
+            return None
+
+        if marker[1] in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+
+        f.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def variant_name(rel_path: str, digest: str, width: int) -> str:
+    stem, ext = path.splitext(fingerprint_name(rel_path, digest))
+
+    return f"{stem}-{width}w{ext}"
+
+
+def resize_image(source: str, destiny: str, width: int):
+    with Image.open(source) as image:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        options = {"optimize": True}
+
+        if image.format == "JPEG":
+            options.update(quality=82, progressive=True)
+
+        makedirs(path.dirname(destiny), exist_ok=True)
+        tmp_path = f"{destiny}.{getpid()}.tmp"
+        resized.save(tmp_path, image.format, **options)
+
+    replace(tmp_path, destiny)
+
+
+def image_attributes(width: int, height: int,
+                     variants: List[Tuple[str, int]]) -> Dict[str, str]:
+    attributes = {"width": str(width), "height": str(height)}
+
+    if len(variants) > 1:
+        attributes["srcset"] = ", ".join(f"{url} {w}w" for url, w in variants)
+        attributes["sizes"] = f"(max-width: {width}px) 100vw, {width}px"
+
+    attributes["loading"] = "lazy"
+
+    return attributes
+
+
+class ImageCache():
+    def __init__(self, cache_dir_path: str):
+        self.cache_dir_path = cache_dir_path
+        self.state_path = path.join(cache_dir_path, "images.json")
+        self.sizes: Dict[str, List[int]] = {}
+
+        if path.exists(self.state_path):
+            with open(self.state_path, 'r') as f:
+                self.sizes = json.load(f)
+
+    def size(self, file_path: str, digest: str) -> Tuple[int, int]:
+        if digest not in self.sizes:
+            self.sizes[digest] = image_size(file_path)
+
+        return self.sizes[digest]
+
+    def variant_path(self, digest: str, width: int, ext: str) -> str:
+        return path.join(self.cache_dir_path, digest[:2], digest,
+                         f"{width}{ext}")
+
+    def save(self):
+        makedirs(self.cache_dir_path, exist_ok=True)
+        write_if_changed(self.state_path, json.dumps(self.sizes,
+                                                     sort_keys=True))
+
+
+def process_images(static_dir_path: str,
+                   pub_dir_path: str,
+                   cache: ImageCache,
+                   widths: List[int] = WIDTHS,
+                   jobs: int = 1,
+                   hash_func: Callable[[str], str] = hash_file,
+                   link: str = "copy") -> Tuple[Dict[str, Dict], List[str]]:
+    images = {}
+    published = []
+    pending = []
+    placements = []
+
+    for s, _ in collect_files(static_dir_path, pub_dir_path):
+        if not is_image(s):
+            continue
+
+        digest = hash_func(s)
+        size = cache.size(s, digest)
+
+        if size is None:
+            continue
+
+        rel_path = path.relpath(s, static_dir_path)
+        variants = []
+
+        if Image is not None:
+            ext = path.splitext(s)[1]
+
+            for width in widths:
+                if width >= size[0]:
+                    continue
+
+                name = variant_name(rel_path, digest, width)
+                cached = cache.variant_path(digest, width, ext)
+                destiny = path.join(pub_dir_path, name)
+
+                if not path.exists(cached):
+                    pending.append((s, cached, width))
+
+                placements.append((cached, destiny))
+                variants.append(("/" + name.replace(path.sep, "/"), width))
+
+            if variants:
+                variants.append(("/" + rel_path.replace(path.sep, "/"),
+                                 size[0]))
+
+        images["/" + rel_path.replace(path.sep, "/")] = image_attributes(
+            size[0], size[1], variants)
+
+    if pending:
+        with ProcessPoolExecutor(max(1, jobs)) as executor:
+            for _ in executor.map(resize_image, *zip(*pending)):
+                pass
+
+    for cached, destiny in placements:
+        if not path.exists(destiny):
+            makedirs(path.dirname(destiny), exist_ok=True)
+            place_file(cached, destiny, link)
+
+        published.append(destiny)
+
+    cache.save()
+
+    return images, published
@@ -1,20 +1,36 @@
-from typing import Dict
-from htmlnode import HTMLNode
+from typing import Callable, Dict
+from htmlnode import END_TAGS, HTMLNode, end_tag, escape_text
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self,
                  tag: str,
                  value: str,
                  props: Dict = None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
-        if self.value is None:
+    def write_html(self, write: Callable[[str], object]):
+        value = self.value
+
+        if value is None:
             raise ValueError()
 
-        if self.tag:
-            return (f"<{self.tag}{self.props_to_html()}>"
-                    f"{self.value}</{self.tag}>")
-        else:
-            return self.value
+        if "&" in value or "<" in value or ">" in value:
+            value = escape_text(value)
+
+        tag = self.tag
+
+        if not tag:
+            write(value)
+            return
+
+        start = self._start_tag
+
+        if start is None:
+            start = self.start_tag()
+
+        write(start)
+        write(value)
+        write(END_TAGS.get(tag) or end_tag(tag))
@@ -0,0 +1,106 @@
+from os import path, walk
+from typing import Dict, Iterable, List, Set, Tuple
+
+from depgraph import output_url, resolve_url
+
+
+def canonical_url(url: str) -> str:
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+
+    return url.rstrip("/") or "/"
+
+
+class LinkReport():
+    def __init__(self, references: int = 0):
+        self.references = references
+        self.dangling: List[Tuple[str, str]] = []
+        self.broken_images: List[Tuple[str, str]] = []
+        self.orphans: List[str] = []
+
+    def ok(self) -> bool:
+        return not self.dangling and not self.broken_images
+
+    def lines(self) -> List[str]:
+        lines = [f"Dangling link in {o}: {url}" for o, url in self.dangling]
+        lines.extend(f"Broken image in {o}: {url}"
+                     for o, url in self.broken_images)
+        lines.extend(f"Orphaned page {o}" for o in self.orphans)
+        lines.append(f"Checked {self.references} references: "
+                     f"{len(self.dangling)} dangling links, "
+                     f"{len(self.broken_images)} broken images, "
+                     f"{len(self.orphans)} orphaned pages")
+
+        return lines
+
+
+class LinkIndex():
+    def __init__(self, pub_dir_path: str):
+        self.pub_dir_path = pub_dir_path
+        self.pages: Dict[str, str] = {}
+        self.files: Set[str] = set()
+        self.references: List[Tuple[str, str, str, bool]] = []
+        self.linked: Set[str] = set()
+
+    def add_page(self, output: str, links: Iterable[str],
+                 images: Iterable[str]):
+        url = output_url(output, self.pub_dir_path)
+        self.pages[canonical_url(url)] = output
+        self.references.extend((output, url, link, False) for link in links)
+        self.references.extend((output, url, src, True) for src in images)
+
+    def add_files(self, root_dir_path: str = None):
+        root_dir_path = root_dir_path or self.pub_dir_path
+
+        for dir_path, _, names in walk(root_dir_path):
+            rel_dir = path.relpath(dir_path, root_dir_path)
+            prefix = ("/" if rel_dir == "." else
+                      "/" + rel_dir.replace(path.sep, "/") + "/")
+            self.files.update(prefix + name for name in names)
+
+    def add_outputs(self, outputs: Iterable[str]):
+        for output in outputs:
+            rel_path = path.relpath(output, self.pub_dir_path)
+
+            if not rel_path.startswith(".."):
+                self.files.add("/" + rel_path.replace(path.sep, "/"))
+
+    def mark_linked(self, outputs: Iterable[str]):
+        self.linked.update(outputs)
+
+    def find_page(self, target: str) -> str:
+        target = canonical_url(target)
+
+        return self.pages.get(target) or self.pages.get(target + ".html")
+
+    def exists(self, target: str) -> bool:
+        return (target in self.files or
+                f"{target.rstrip("/")}/index.html" in self.files)
+
+    def check(self) -> LinkReport:
+        report = LinkReport(len(self.references))
+        linked = set(self.linked)
+
+        for output, url, reference, image in self.references:
+            target = resolve_url(reference, url)
+
+            if image:
+                if target not in self.files:
+                    report.broken_images.append((output, reference))
+
+                continue
+
+            page = self.find_page(target)
+
+            if page is not None:
+                if page != output:
+                    linked.add(page)
+            elif not self.exists(target):
+                report.dangling.append((output, reference))
+
+        report.dangling.sort()
+        report.broken_images.sort()
+        report.orphans = sorted(o for u, o in self.pages.items()
+                                if u != "/" and o not in linked)
+
+        return report
@@ -0,0 +1,202 @@
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from os import makedirs, path
+from typing import Dict, Iterable, List, Tuple
+from xml.sax.saxutils import escape
+
+from assets import open_atomic
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+SUMMARY_LENGTH = 200
+
+SITEMAP_NAME = "sitemap.xml"
+RSS_NAME = "rss.xml"
+ATOM_NAME = "atom.xml"
+
+ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+
+class PageIndex():
+    def __init__(self, index_path: str):
+        self.path = index_path
+        self.pages: Dict[str, Dict] = {}
+
+        if path.exists(index_path):
+            with open(index_path, 'r') as f:
+                self.pages = json.load(f).get("pages", {})
+
+    def update(self, output: str, info: Dict):
+        self.pages[output] = info
+
+    def retain(self, outputs: Iterable[str]):
+        outputs = set(outputs)
+
+        for output in list(self.pages):
+            if output not in outputs:
+                del self.pages[output]
+
+    def save(self):
+        makedirs(path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            json.dump({"pages": self.pages}, f, indent=1, sort_keys=True)
+
+
+def summarize(text: str, length: int = SUMMARY_LENGTH) -> str:
+    text = " ".join(text.split())
+
+    if len(text) <= length:
+        return text
+
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def section_of(output: str) -> str:
+    if path.basename(output) == "index.html":
+        return path.dirname(path.dirname(output))
+
+    return path.dirname(output)
+
+
+def collect_sections(outputs: Iterable[str],
+                     pub_dir_path: str) -> Dict[str, List[str]]:
+    outputs = list(outputs)
+    existing = set(outputs)
+    root_index = path.join(pub_dir_path, "index.html")
+    sections = {}
+
+    for output in outputs:
+        section = section_of(output)
+
+        if (output != root_index and
+                path.join(section, "index.html") not in existing):
+            sections.setdefault(section, []).append(output)
+
+    return sections
+
+
+def paginate(items: List, page_size: int) -> List[List]:
+    if page_size < 1 or not items:
+        return [items]
+
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)]
+
+
+def listing_url(section_url: str, page_number: int) -> str:
+    base = section_url.rstrip("/")
+
+    if page_number == 1:
+        return f"{base}/"
+
+    return f"{base}/page/{page_number}/"
+
+
+def listing_path(section_dir: str, page_number: int) -> str:
+    if page_number == 1:
+        return path.join(section_dir, "index.html")
+
+    return path.join(section_dir, "page", str(page_number), "index.html")
+
+
+def listing_node(pages: List[Dict], section_url: str, page_number: int,
+                 page_count: int) -> HTMLNode:
+    items = []
+
+    for page in pages:
+        children = [ParentNode("h2", [LeafNode("a", page["title"],
+                                               {"href": page["url"]})])]
+
+        if page["summary"]:
+            children.append(LeafNode("p", page["summary"]))
+
+        items.append(ParentNode("li", children))
+
+    children = [ParentNode("ul", items)] if items else []
+    links = []
+
+    if page_number > 1:
+        links.append(LeafNode("a", "Newer", {
+            "href": listing_url(section_url, page_number - 1),
+            "rel": "prev"}))
+
+    if page_number < page_count:
+        links.append(LeafNode("a", "Older", {
+            "href": listing_url(section_url, page_number + 1),
+            "rel": "next"}))
+
+    if links:
+        children.append(ParentNode("nav", links))
+
+    if not children:
+        children.append(LeafNode("p", "Nothing here yet."))
+
+    return ParentNode("div", children)
+
+
+def to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def write_sitemap(file_path: str, base_url: str,
+                  entries: Iterable[Tuple[str, float]]):
+    with open_atomic(file_path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/'
+                'sitemap/0.9">\n')
+
+        for url, updated in entries:
+            f.write(f"<url><loc>{escape(base_url + url)}</loc>"
+                    f"<lastmod>{to_datetime(updated).date().isoformat()}"
+                    "</lastmod></url>\n")
+
+        f.write("</urlset>\n")
+
+
+def write_rss(file_path: str, base_url: str, title: str, section_url: str,
+              pages: Iterable[Dict]):
+    with open_atomic(file_path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<rss version="2.0"><channel>\n'
+                f"<title>{escape(title)}</title>"
+                f"<link>{escape(base_url + section_url)}</link>"
+                f"<description>{escape(title)}</description>\n")
+
+        for page in pages:
+            link = escape(base_url + page["url"])
+            published = format_datetime(to_datetime(page["updated"]))
+            f.write(f"<item><title>{escape(page['title'])}</title>"
+                    f"<link>{link}</link><guid>{link}</guid>"
+                    f"<pubDate>{published}</pubDate>"
+                    f"<description>{escape(page['summary'])}</description>"
+                    "</item>\n")
+
+        f.write("</channel></rss>\n")
+
+
+def write_atom(file_path: str, base_url: str, title: str, section_url: str,
+               pages: Iterable[Dict], updated: float):
+    section_link = escape(base_url + section_url, ATTRIBUTE_ENTITIES)
+    feed_link = escape(base_url + listing_url(section_url, 1) + ATOM_NAME,
+                       ATTRIBUTE_ENTITIES)
+
+    with open_atomic(file_path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+                f"<title>{escape(title)}</title>"
+                f'<link href="{section_link}"/>'
+                f'<link rel="self" href="{feed_link}"/>'
+                f"<id>{feed_link}</id>"
+                f"<updated>{to_datetime(updated).isoformat()}</updated>\n")
+
+        for page in pages:
+            link = escape(base_url + page["url"], ATTRIBUTE_ENTITIES)
+            f.write(f"<entry><title>{escape(page['title'])}</title>"
+                    f'<link href="{link}"/><id>{link}</id>'
+                    f"<updated>{to_datetime(page['updated']).isoformat()}"
+                    f"</updated><summary>{escape(page['summary'])}</summary>"
+                    "</entry>\n")
+
+        f.write("</feed>\n")
@@ -1,26 +1,547 @@
-from os import listdir, makedirs, path
-import re
+from argparse import ArgumentParser
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from itertools import chain
+from os import cpu_count, listdir, makedirs, path, remove, stat
 from shutil import copy, rmtree
+from threading import Thread
+from time import perf_counter, sleep
+from typing import (Callable, Dict, Iterable, Iterator, List, Set, TextIO,
+                    Tuple)
 
-from parser import markdown_to_html_node
+from assets import (LINK_MODES, collect_files, fingerprint_assets,
+                    place_file, sync_files, write_asset_manifest,
+                    write_atomic, write_if_changed)
+from buildprofile import BuildProfile, stage
+from cache import ParseCache, parser_version
+from compress import (collect_compressible, compress_files, is_compressible,
+                      variant_paths)
+from depgraph import DependencyGraph, output_url, page_images, page_links
+from htmlnode import HTMLNode, set_url_map
+from linkcheck import LinkIndex, LinkReport
+from images import WIDTHS, Image, ImageCache, process_images
+from listings import (ATOM_NAME, RSS_NAME, SITEMAP_NAME, PageIndex,
+                      collect_sections, listing_node, listing_path,
+                      listing_url, paginate, summarize, write_atom, write_rss,
+                      write_sitemap)
+from manifest import Manifest, code_version, hash_file
+from metadata import (MetadataIndex, page_date, page_title, pages_node,
+                      query, read_front_matter, split_front_matter)
+from minify import minify_css
+from parentnode import ParentNode
+from parser import (block_to_block_type, block_to_html_node,
+                    markdown_lines_to_html_node, markdown_to_blocks)
+from pipeline import BoundedWriter, prefetch
+from search import SearchIndex, count_terms, node_text, term_frequencies
+from shards import (SHARD_RECORD_NAME, find_shards, parse_shard,
+                    read_shard_record, relocate, shard_name, shard_pages,
+                    write_shard_record)
+from template import load_template
+from textnode import set_image_attributes
+from watch import create_watcher
 
+TEMPLATE_NAME = "template.html"
 
-def copy_static_content():
-    pub_dir_path = path.join(".", "public")
-    static_dir_path = path.join(".", "static")
+PUB_DIR_PATH = path.join(".", "public")
+STATIC_DIR_PATH = path.join(".", "static")
+CONTENT_DIR_PATH = path.join(".", "content")
+TEMPLATE_PATH = path.join(".", TEMPLATE_NAME)
+PARSE_CACHE_DIR_PATH = path.join(".", ".cache", "parse")
+DEPENDENCY_GRAPH_PATH = path.join(".", ".cache", "depgraph.json")
+SEARCH_STATE_PATH = path.join(".", ".cache", "search.json")
+PAGE_INDEX_PATH = path.join(".", ".cache", "pages.json")
+IMAGE_CACHE_DIR_PATH = path.join(".", ".cache", "images")
+METADATA_INDEX_PATH = path.join(".", ".cache", "metadata.json")
+METADATA_TABLE_PATH = path.join(".", ".cache", "metadata-pages.json")
+MANIFEST_PATH = path.join(".", ".cache", "manifest.json")
+SHARDS_DIR_PATH = path.join(".", "shards")
 
-    if (path.exists(pub_dir_path)):
+SEARCH_DIR_NAME = "search"
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+STREAM_THRESHOLD = 8 << 20
+
+BASE_URL = "http://localhost:8888"
+
+parse_cache = ParseCache()
+verbosity = 0
+asset_map: Dict[str, str] = {}
+image_map: Dict[str, Dict[str, str]] = {}
+minify = False
+search_terms = False
+stream_threshold = STREAM_THRESHOLD
+metadata_pages: Dict[str, Dict] = {}
+
+
+class BuildOptions():
+    def __init__(self,
+                 incremental: bool = False,
+                 jobs: int = 1,
+                 profile: BuildProfile = None,
+                 static_checksum: bool = False,
+                 link: str = "reflink",
+                 fingerprint: bool = False,
+                 compress: bool = False,
+                 minify: bool = False,
+                 search: bool = False,
+                 collections: bool = False,
+                 base_url: str = BASE_URL,
+                 page_size: int = 10,
+                 io_threads: int = 0,
+                 images: bool = False,
+                 image_widths: List[int] = WIDTHS,
+                 shard: Tuple[int, int] = None,
+                 check_links: bool = False):
+        self.incremental = incremental
+        self.jobs = jobs
+        self.profile = profile
+        self.static_checksum = static_checksum
+        self.link = link
+        self.fingerprint = fingerprint
+        self.compress = compress
+        self.minify = minify
+        self.search = search
+        self.collections = collections
+        self.base_url = base_url
+        self.page_size = page_size
+        self.io_threads = io_threads
+        self.images = images
+        self.image_widths = image_widths
+        self.shard = shard
+        self.check_links = check_links
+
+    def signature(self) -> str:
+        return f"fingerprint={self.fingerprint},minify={self.minify}"
+
+
+def configure_parse_cache(cache_dir: str = None, version: str = None):
+    global parse_cache
+    parse_cache = ParseCache(cache_dir=cache_dir, version=version)
+
+
+def set_verbosity(level: int):
+    global verbosity
+    verbosity = level
+
+
+def set_asset_map(assets: Dict[str, str]):
+    global asset_map
+
+    # Cached pages keep start tags rendered with the previous URLs
+    if assets != asset_map:
+        configure_parse_cache(parse_cache.cache_dir, parse_cache.version)
+
+    asset_map = assets
+    set_url_map(assets)
+
+
+def set_minify(enabled: bool):
+    global minify
+    minify = enabled
+
+
+def set_search_terms(enabled: bool):
+    global search_terms
+    search_terms = enabled
+
+
+def set_stream_threshold(size: int):
+    global stream_threshold
+    stream_threshold = size
+
+
+def set_image_map(attributes: Dict[str, Dict[str, str]]):
+    global image_map
+    image_map = attributes
+    set_image_attributes(attributes)
+
+    if attributes:
+        digest = hashlib.sha256(json.dumps(attributes, sort_keys=True)
+                                .encode())
+        configure_parse_cache(parse_cache.cache_dir,
+                              f"{parser_version()}:{digest.hexdigest()}")
+    else:
+        configure_parse_cache(parse_cache.cache_dir)
+
+
+def set_metadata(pages: Dict[str, Dict]):
+    global metadata_pages
+    metadata_pages = pages
+
+
+def worker_settings() -> Dict:
+    return {"parse_cache_dir": parse_cache.cache_dir,
+            "image_map": image_map,
+            "verbosity": verbosity,
+            "asset_map": asset_map,
+            "minify": minify,
+            "search_terms": search_terms,
+            "stream_threshold": stream_threshold,
+            "metadata": metadata_pages}
+
+
+def init_worker(settings: Dict):
+    configure_parse_cache(settings["parse_cache_dir"])
+    set_image_map(settings["image_map"])
+    set_verbosity(settings["verbosity"])
+    set_asset_map(settings["asset_map"])
+    set_minify(settings["minify"])
+    set_search_terms(settings["search_terms"])
+    set_stream_threshold(settings["stream_threshold"])
+    set_metadata(settings["metadata"])
+
+
+def cache_path(file_path, shard: Tuple[int, int] = None):
+    if shard is None:
+        return file_path
+
+    return path.join(path.dirname(file_path), "shards", shard_name(shard),
+                     path.basename(file_path))
+
+
+def copy_static_content(options: BuildOptions = None) -> LinkReport:
+    options = options or BuildOptions()
+    shard = options.shard
+    pub_dir_path = (PUB_DIR_PATH if shard is None else
+                    path.join(SHARDS_DIR_PATH, shard_name(shard)))
+    static_dir_path = STATIC_DIR_PATH
+    profile = options.profile
+    manifest = None
+
+    if options.incremental:
+        manifest = Manifest(cache_path(MANIFEST_PATH, shard),
+                            f"{code_version()}:{options.signature()}")
+    elif (path.exists(pub_dir_path)):
         rmtree(pub_dir_path)
 
-    makedirs(pub_dir_path)
+    makedirs(pub_dir_path, exist_ok=True)
+    set_minify(options.minify)
+    set_search_terms(options.search)
+
+    with stage(profile, "static copy"):
+        copy_static_files(static_dir_path, pub_dir_path, manifest,
+                          options.static_checksum, options.link,
+                          options.minify)
+
+    page_inputs = []
 
-    copy_tree(static_dir_path, pub_dir_path)
+    if options.images:
+        with stage(profile, "images"):
+            page_inputs.append(process_static_images(
+                static_dir_path, pub_dir_path, manifest,
+                options.image_widths, options.jobs, options.link))
 
-    from_path = path.join(".", "content")
-    template_path = path.join(".", "template.html")
+    if options.fingerprint:
+        with stage(profile, "fingerprint"):
+            page_inputs.append(fingerprint_static_files(
+                static_dir_path, pub_dir_path, manifest, options.link))
+
+    from_path = CONTENT_DIR_PATH
+    template_path = TEMPLATE_PATH
     dest_path = path.join(pub_dir_path)
+    graph = DependencyGraph(cache_path(DEPENDENCY_GRAPH_PATH, shard),
+                            pub_dir_path)
+    page_index = PageIndex(cache_path(PAGE_INDEX_PATH, shard))
+    metadata = MetadataIndex(cache_path(METADATA_INDEX_PATH, shard),
+                             cache_path(METADATA_TABLE_PATH, shard))
+    search_index = None
+
+    if options.search:
+        search_index = SearchIndex(cache_path(SEARCH_STATE_PATH, shard),
+                                   code_version())
+
+    pages = generate_pages_recursive(from_path, template_path, dest_path,
+                                     manifest, options.jobs, profile,
+                                     page_inputs, graph, page_index,
+                                     options.io_threads, metadata, shard,
+                                     search_index)
+    graph.save()
+    metadata.save()
+
+    report = None
+
+    if shard is None:
+        report = finish_site(pages, pub_dir_path, graph, page_index, options,
+                             manifest, search_index)
+    else:
+        write_shard_record(pub_dir_path, {
+            path.relpath(d, pub_dir_path): {
+                "graph": graph.outputs[d],
+                "page": page_index.pages.get(d),
+                "search": (search_index.pages.get(s)
+                           if search_index is not None else None)}
+            for s, d, _ in pages})
+        page_index.save()
+
+        if search_index is not None:
+            search_index.save()
+
+    if manifest is not None:
+        if shard is not None:
+            manifest.record_output(path.join(pub_dir_path,
+                                             SHARD_RECORD_NAME))
+
+        for output in manifest.remove_stale(pub_dir_path):
+            print(f"Removing stale output {output}")
+
+        manifest.save()
+
+    return report
+
+
+def finish_site(pages: List[Tuple[str, str, str]], pub_dir_path,
+                graph: DependencyGraph, page_index: PageIndex,
+                options: BuildOptions,
+                manifest: Manifest = None,
+                search_index: SearchIndex = None) -> LinkReport:
+    profile = options.profile
+    report = None
+
+    if options.search:
+        with stage(profile, "search index"):
+            build_search_index(pages, pub_dir_path, search_index or
+                               SearchIndex(SEARCH_STATE_PATH,
+                                           code_version()), manifest)
+
+    if options.collections:
+        with stage(profile, "collections"):
+            write_collections(pages, pub_dir_path, page_index,
+                              options.base_url, options.page_size, manifest)
+
+    page_index.save()
+
+    if options.check_links:
+        with stage(profile, "link check"):
+            report = check_links(pub_dir_path, graph, pages,
+                                 options.collections, manifest)
+
+    if options.compress:
+        with stage(profile, "compress"):
+            compress_outputs(pub_dir_path, manifest)
+
+    return report
+
+
+def check_links(pub_dir_path, graph: DependencyGraph,
+                pages: List[Tuple[str, str, str]],
+                collections: bool = False,
+                manifest: Manifest = None) -> LinkReport:
+    index = LinkIndex(pub_dir_path)
+
+    for output, entry in graph.outputs.items():
+        index.add_page(output, entry["links"], entry.get("images", []))
+
+    if manifest is None:
+        index.add_files()
+    else:
+        # Stale outputs are still on disk until the build removes them
+        index.add_outputs(manifest.outputs)
+
+    if collections:
+        for outputs in collect_sections((d for _, d, _ in pages),
+                                        pub_dir_path).values():
+            index.mark_linked(outputs)
+
+    report = index.check()
+
+    for line in report.lines():
+        print(line)
+
+    return report
+
+
+def merge_shards(options: BuildOptions = None) -> LinkReport:
+    options = options or BuildOptions()
+    shard_dirs = find_shards(SHARDS_DIR_PATH)
+    pub_dir_path = PUB_DIR_PATH
+
+    if path.exists(pub_dir_path):
+        rmtree(pub_dir_path)
+
+    makedirs(pub_dir_path)
+    set_minify(options.minify)
+    graph = DependencyGraph(DEPENDENCY_GRAPH_PATH, pub_dir_path)
+    graph.retain([])
+    page_index = PageIndex(PAGE_INDEX_PATH)
+    page_index.retain([])
+    searches = {}
+    pages = []
+
+    for shard_dir in shard_dirs:
+        with stage(options.profile, "merge", shard_dir):
+            records = read_shard_record(shard_dir)
+            record_path = path.join(shard_dir, SHARD_RECORD_NAME)
+            sync_files([(s, d) for s, d in collect_files(shard_dir,
+                                                         pub_dir_path)
+                        if s != record_path], link=options.link)
 
-    generate_pages_recursive(from_path, template_path, dest_path)
+            for rel_path, record in records.items():
+                d = path.join(pub_dir_path, rel_path)
+                entry = record["graph"]
+                graph.add(d, entry["source"], entry["template"],
+                          [relocate(i, shard_dir, pub_dir_path)
+                           for i in entry["inputs"]], entry["links"],
+                          entry.get("images", []))
+
+                if record["page"] is not None:
+                    page_index.update(d, record["page"])
+
+                if record.get("search") is not None:
+                    searches[entry["source"]] = record["search"]
+
+                pages.append((entry["source"], d, entry["template"]))
+
+    graph.save()
+    asset_manifest_path = path.join(pub_dir_path, ASSET_MANIFEST_NAME)
+
+    if path.isfile(asset_manifest_path):
+        with open(asset_manifest_path, 'r') as f:
+            set_asset_map(json.load(f))
+
+    order = {s: i for i, (s, _, _) in enumerate(collect_pages(
+        CONTENT_DIR_PATH, pub_dir_path, TEMPLATE_PATH))}
+    pages.sort(key=lambda p: order.get(p[0], len(order)))
+    search_index = None
+
+    if options.search:
+        search_index = SearchIndex(SEARCH_STATE_PATH, code_version())
+
+        for s, _, _ in pages:
+            if s in searches:
+                search_index.update(s, searches[s]["hash"],
+                                    searches[s]["url"], searches[s]["title"],
+                                    searches[s]["terms"])
+
+    return finish_site(pages, pub_dir_path, graph, page_index, options,
+                       search_index=search_index)
+
+
+def copy_static_files(static_dir_path, pub_dir_path,
+                      manifest: Manifest = None,
+                      checksum: bool = False,
+                      link: str = "reflink",
+                      minify_css: bool = False):
+    if manifest is None and not minify_css:
+        copy_tree(static_dir_path, pub_dir_path)
+        return
+
+    files = []
+    stylesheets = []
+
+    for s, d in collect_files(static_dir_path, pub_dir_path):
+        if minify_css and s.endswith(".css"):
+            stylesheets.append((s, d))
+        else:
+            files.append((s, d))
+
+    if manifest is None:
+        for s, d in files:
+            copy(s, d)
+    else:
+        for s, d, copied in sync_files(files, checksum, link):
+            if copied and verbosity > 0:
+                print(f"Copying {s} to {d}")
+
+            manifest.record_output(d)
+
+    for s, d in stylesheets:
+        if manifest is None or not manifest.is_fresh(d, [s]):
+            if verbosity > 0:
+                print(f"Minifying {s} to {d}")
+
+            minify_css_file(s, d)
+
+        if manifest is not None:
+            manifest.record(d, [s])
+
+
+def minify_css_file(source: str, destiny: str):
+    with open(source, 'r') as f:
+        css = f.read()
+
+    write_atomic(destiny, minify_css(css).encode())
+
+
+def fingerprint_static_files(static_dir_path, pub_dir_path,
+                             manifest: Manifest = None,
+                             link: str = "reflink") -> str:
+    hash_func = hash_file if manifest is None else manifest.hash
+    assets = {}
+
+    for url, fingerprinted_url, d in fingerprint_assets(
+            static_dir_path, pub_dir_path, hash_func, link):
+        assets[url] = fingerprinted_url
+
+        if manifest is not None:
+            manifest.record_output(d)
+
+    asset_manifest_path = path.join(pub_dir_path, ASSET_MANIFEST_NAME)
+    write_asset_manifest(asset_manifest_path, assets)
+    set_asset_map(assets)
+
+    if manifest is not None:
+        manifest.record_output(asset_manifest_path)
+
+    return asset_manifest_path
+
+
+def process_static_images(static_dir_path, pub_dir_path,
+                          manifest: Manifest = None,
+                          widths: List[int] = WIDTHS,
+                          jobs: int = 1,
+                          link: str = "reflink") -> str:
+    if Image is None:
+        print("Pillow is not installed, images get their dimensions but no "
+              "resized variants")
+
+    hash_func = hash_file if manifest is None else manifest.hash
+    attributes, published = process_images(
+        static_dir_path, pub_dir_path, ImageCache(IMAGE_CACHE_DIR_PATH),
+        widths, jobs, hash_func, link)
+
+    if manifest is not None:
+        for d in published:
+            manifest.record_output(d)
+
+    attributes_path = path.join(IMAGE_CACHE_DIR_PATH, "attributes.json")
+    write_if_changed(attributes_path,
+                     json.dumps(attributes, indent=1, sort_keys=True))
+    set_image_map(attributes)
+
+    return attributes_path
+
+
+def compress_outputs(pub_dir_path, manifest: Manifest = None):
+    pending = []
+
+    if manifest is None:
+        files = collect_compressible(pub_dir_path)
+    else:
+        files = sorted(o for o in manifest.outputs
+                       if is_compressible(o) and not
+                       path.relpath(o, pub_dir_path).startswith(".."))
+
+    for file_path in files:
+        if manifest is not None:
+            variants = variant_paths(file_path)
+            fresh = all(manifest.is_fresh(v, [file_path]) for v in variants)
+
+            for v in variants:
+                manifest.record(v, [file_path])
+
+            if fresh:
+                continue
+
+        pending.append(file_path)
+
+    for file_path, variants in compress_files(pending, cpu_count() or 1):
+        if verbosity > 0:
+            print(f"Compressing {file_path} to {", ".join(variants)}")
 
 
 def copy_tree(source: str, destiny: str):
@@ -29,54 +550,795 @@ def copy_tree(source: str, destiny: str):
         d = path.join(destiny, d)
 
         if path.isdir(s):
-            makedirs(d)
+            makedirs(d, exist_ok=True)
             copy_tree(s, d)
         else:
             copy(s, d)
 
 
-def extract_title(markdown: str):
-    match = re.findall(r"^# .+", markdown)
-
-    if len(match) > 0:
-        return match[0][2:].strip()
+def collect_pages(dir_path_content, dest_dir_path,
+                  template_path) -> List[Tuple[str, str, str]]:
+    pages = []
+    entries = listdir(dir_path_content)
 
-    raise ValueError("No H1 Heading found")
+    if TEMPLATE_NAME in entries:
+        template_path = path.join(dir_path_content, TEMPLATE_NAME)
 
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    for d in listdir(dir_path_content):
+    for d in entries:
         s = path.join(dir_path_content, d)
         d = path.join(dest_dir_path, d)
 
         if path.isdir(s):
-            makedirs(d)
-            generate_pages_recursive(s, template_path, d)
-        else:
-            d = d[:-2]+"html"
-            print(f"Generating page from {s} to {
-                d} using {template_path}")
+            makedirs(d, exist_ok=True)
+            pages.extend(collect_pages(s, d, template_path))
+        elif s.endswith(".md"):
+            pages.append((s, d[:-2]+"html", template_path))
+
+    return pages
+
+
+def log_page(from_path, template_path, dest_path):
+    if verbosity > 0:
+        print(f"Generating page from {from_path} to {
+            dest_path} using {template_path}")
+
+
+def query_pages(arguments: Dict[str, str]) -> HTMLNode:
+    return pages_node(query(metadata_pages, arguments))
+
+
+def template_context(meta: Dict, body: str, content: HTMLNode) -> Dict:
+    context = {k: ", ".join(v) if isinstance(v, list) else v
+               for k, v in meta.items()}
+    context.update(Title=page_title(meta, body), Content=content,
+                   Pages=query_pages)
+
+    return context
+
+
+def generate_page(from_path, template_path, dest_path,
+                  profile: BuildProfile = None):
+    log_page(from_path, template_path, dest_path)
+
+    if path.getsize(from_path) >= stream_threshold:
+        with stage(profile, "stream", from_path):
+            return generate_page_streamed(from_path, template_path,
+                                          dest_path)
+
+    with stage(profile, "read", from_path):
+        with open(from_path, 'r') as f:
+            content_md = f.read()
+
+    with open(dest_path, 'w') as f:
+        return render_page_to(f, from_path, template_path, content_md,
+                              profile)
+
+
+def render_page_to(writer: TextIO, from_path, template_path, content_md: str,
+                   profile: BuildProfile = None) -> Dict:
+    meta, body = split_front_matter(content_md)
+    content = parse_markdown(body, from_path, profile)
+    template = load_template(template_path, minify)
+
+    with stage(profile, "render", from_path):
+        template.render_to(writer, template_context(meta, body, content),
+                           asset_map)
+
+    info = page_info(meta, body, content)
+
+    if search_terms:
+        with stage(profile, "index", from_path):
+            info["terms"] = term_frequencies(content)
+
+    return info
+
+
+def parse_markdown(markdown: str, from_path,
+                   profile: BuildProfile = None) -> HTMLNode:
+    if profile is None:
+        return parse_cache.parse(markdown)
+
+    return parse_cache.parse(markdown, partial(parse_staged, page=from_path,
+                                               profile=profile))
+
+
+def parse_staged(markdown: str, page, profile: BuildProfile) -> HTMLNode:
+    with profile.stage("block split", page):
+        blocks = markdown_to_blocks(markdown)
 
-            template_file = open(template_path, 'r')
-            template = template_file.read()
-            template_file.close()
+    with profile.stage("block typing", page):
+        block_types = [block_to_block_type(b) for b in blocks]
 
-            content_file = open(path.join(s), 'r')
-            content_md = content_file.read()
-            content_file.close()
+    with profile.stage("inline parse", page):
+        return ParentNode("div", [block_to_html_node(b, t)
+                                  for b, t in zip(blocks, block_types)])
 
-            content = markdown_to_html_node(content_md).to_html()
-            title = extract_title(content_md)
 
-            index_html = template.replace(
-                "{{ Title }}", title).replace("{{ Content }}", content)
+def page_info(meta: Dict, body: str, content: HTMLNode) -> Dict:
+    summary = ""
 
-            with open(d, 'w') as f:
-                f.write(index_html)
+    for child in content.children:
+        if child.tag == "p" and any(c.tag not in ("a", "img") and
+                                    c.value and c.value.strip()
+                                    for c in child.children):
+            summary = summarize("".join(node_text(child)))
+            break
+
+    return {"title": page_title(meta, body),
+            "date": page_date(meta),
+            "summary": summary,
+            "links": page_links(body),
+            "images": page_images(body)}
+
+
+def generate_page_streamed(from_path, template_path, dest_path):
+    template = load_template(template_path, minify)
+    links = set()
+    images = set()
+
+    terms = {}
+
+    with open(from_path, 'r') as content_file:
+        meta, first_line = read_front_matter(content_file)
+        lines = collect_links(chain([first_line], content_file), links,
+                              images)
+        content = markdown_lines_to_html_node(lines)
+
+        if search_terms:
+            content.children = count_terms(content.children, terms)
+
+        context = template_context(meta, first_line, content)
+
+        with open(dest_path, 'w') as f:
+            template.render_to(f, context, asset_map)
+
+    info = {"title": context["Title"], "date": page_date(meta),
+            "summary": "", "links": sorted(links), "images": sorted(images)}
+
+    if search_terms:
+        info["terms"] = terms
+
+    return info
+
+
+def collect_links(lines: Iterable[str], links: Set[str],
+                  images: Set[str]) -> Iterator[str]:
+    for line in lines:
+        if "](" in line:
+            links.update(page_links(line))
+            images.update(page_images(line))
+
+        yield line
+
+
+def generate_page_events(from_path, template_path, dest_path):
+    profile = BuildProfile()
+    info = generate_page(from_path, template_path, dest_path, profile)
+
+    return info, profile.events
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path,
+                             manifest: Manifest = None, jobs: int = 1,
+                             profile: BuildProfile = None,
+                             page_inputs: List[str] = None,
+                             graph: DependencyGraph = None,
+                             page_index: PageIndex = None,
+                             io_threads: int = 0,
+                             metadata: MetadataIndex = None,
+                             shard: Tuple[int, int] = None,
+                             search_index: SearchIndex = None):
+    page_inputs = page_inputs or []
+    record = partial(record_page, dest_dir_path=dest_dir_path, graph=graph,
+                     page_index=page_index, search_index=search_index,
+                     hash_func=hash_file if manifest is None else
+                     manifest.hash)
+    pages = []
+    collected = collect_pages(dir_path_content, dest_dir_path, template_path)
+
+    if metadata is not None:
+        with stage(profile, "metadata"):
+            refresh_metadata(metadata, collected, dest_dir_path)
+
+    if shard is not None:
+        collected = shard_pages(collected, shard)
+
+    if graph is not None:
+        graph.retain(d for _, d, _ in collected)
+
+    if page_index is not None:
+        page_index.retain(d for _, d, _ in collected)
+
+    if search_index is not None:
+        search_index.retain(s for s, _, _ in collected)
+
+    for s, d, t in collected:
+        inputs = page_inputs
+
+        if metadata is not None and queries_metadata(t):
+            inputs = [*page_inputs, metadata.table_path]
+
+        if graph is not None:
+            previous = graph.outputs.get(d, {})
+            graph.add(d, s, t, inputs, previous.get("links", []),
+                      previous.get("images", []))
+
+        if manifest is not None:
+            fresh = manifest.is_fresh(d, [s, t, *inputs])
+            manifest.record(d, [s, t, *inputs])
+
+            if fresh:
+                continue
+
+        pages.append((s, d, t))
+
+    if jobs > 1 and len(pages) > 1:
+        chunksize = max(1, len(pages) // (jobs * 4))
+
+        executor = ProcessPoolExecutor(jobs,
+                                       initializer=init_worker,
+                                       initargs=(worker_settings(),))
+        render = generate_page if profile is None else generate_page_events
+
+        with executor:
+            results = executor.map(render,
+                                   [s for s, _, _ in pages],
+                                   [t for _, _, t in pages],
+                                   [d for _, d, _ in pages],
+                                   chunksize=chunksize)
+
+            for (s, d, _), info in zip(pages, results):
+                if profile is not None:
+                    info, events = info
+                    profile.extend(events)
+
+                record(s, d, info)
+    elif io_threads > 0 and len(pages) > 1:
+        for s, d, info in generate_pages_pipelined(pages, io_threads,
+                                                   profile):
+            record(s, d, info)
+    else:
+        for s, d, t in pages:
+            info = generate_page(s, t, d, profile)
+            record(s, d, info)
+
+    return collected
+
+
+def refresh_metadata(metadata: MetadataIndex,
+                     pages: List[Tuple[str, str, str]], dest_dir_path) -> bool:
+    metadata.refresh((s, output_url(d, dest_dir_path)) for s, d, _ in pages)
+    set_metadata(metadata.pages)
+
+    return metadata.write_table()
+
+
+def queries_metadata(template_path) -> bool:
+    return "Pages" in load_template(template_path, minify).variables()
+
+
+def read_source(page: Tuple[str, str, str],
+                profile: BuildProfile = None) -> str:
+    if path.getsize(page[0]) >= stream_threshold:
+        return None
+
+    with stage(profile, "read", page[0]):
+        with open(page[0], 'r') as f:
+            return f.read()
+
+
+def write_text(file_path, text: str, page=None,
+               profile: BuildProfile = None):
+    with stage(profile, "write", page):
+        with open(file_path, 'w') as f:
+            f.write(text)
+
+
+def generate_pages_pipelined(pages: List[Tuple[str, str, str]],
+                             io_threads: int,
+                             profile: BuildProfile = None
+                             ) -> Iterator[Tuple[str, str, Dict]]:
+    depth = io_threads * 4
+
+    with ThreadPoolExecutor(io_threads) as executor:
+        writer = BoundedWriter(executor, depth)
+
+        for (s, d, t), content_md in prefetch(
+                executor, partial(read_source, profile=profile), pages,
+                depth):
+            if content_md is None:
+                yield s, d, generate_page(s, t, d, profile)
+                continue
+
+            log_page(s, t, d)
+            buffer = StringIO()
+            info = render_page_to(buffer, s, t, content_md, profile)
+            writer.submit(write_text, d, buffer.getvalue(), s, profile)
+
+            yield s, d, info
+
+        writer.drain()
+
+
+def record_page(from_path, dest_path, info: Dict, dest_dir_path,
+                graph: DependencyGraph = None, page_index: PageIndex = None,
+                search_index: SearchIndex = None,
+                hash_func: Callable[[str], str] = hash_file):
+    if graph is not None:
+        graph.update_links(dest_path, info["links"], info["images"])
+
+    if page_index is not None:
+        updated = info["date"]
+
+        if updated is None:
+            updated = stat(from_path).st_mtime
+
+        page_index.update(dest_path, {
+            "source": from_path,
+            "url": output_url(dest_path, dest_dir_path),
+            "title": info["title"],
+            "summary": info["summary"],
+            "updated": updated})
+
+    if search_index is not None and "terms" in info:
+        search_index.update(from_path, hash_func(from_path),
+                            output_url(dest_path, dest_dir_path),
+                            info["title"], info["terms"])
+
+
+def read_page_info(from_path) -> Dict:
+    with open(from_path, 'r') as f:
+        if path.getsize(from_path) >= stream_threshold:
+            meta, first_line = read_front_matter(f)
+            return {"title": page_title(meta, first_line),
+                    "date": page_date(meta), "summary": "", "links": [],
+                    "images": []}
+
+        content_md = f.read()
+
+    meta, body = split_front_matter(content_md)
+
+    return page_info(meta, body, parse_cache.parse(body))
+
+
+def write_collections(pages: List[Tuple[str, str, str]], pub_dir_path,
+                      page_index: PageIndex, base_url: str = BASE_URL,
+                      page_size: int = 10, manifest: Manifest = None):
+    for s, d, _ in pages:
+        if d not in page_index.pages:
+            record_page(s, d, read_page_info(s), pub_dir_path,
+                        page_index=page_index)
+
+    written = []
+    listings = []
+
+    for section_dir, outputs in sorted(
+            collect_sections((d for _, d, _ in pages), pub_dir_path).items()):
+        posts = sorted((page_index.pages[o] for o in outputs),
+                       key=lambda p: (-p["updated"], p["url"]))
+        section_url = output_url(path.join(section_dir, "index.html"),
+                                 pub_dir_path)
+        name = path.relpath(section_dir, pub_dir_path)
+        title = ("Home" if name == "." else
+                 path.basename(name).replace("-", " ").title())
+        template = load_template(
+            resolve_template(path.join(CONTENT_DIR_PATH, name, "index.md"),
+                             CONTENT_DIR_PATH, TEMPLATE_PATH), minify)
+        chunks = paginate(posts, page_size)
+
+        for number, chunk in enumerate(chunks, 1):
+            dest_path = listing_path(section_dir, number)
+            makedirs(path.dirname(dest_path), exist_ok=True)
+            html = template.render({
+                "Title": title,
+                "Content": listing_node(chunk, section_url, number,
+                                        len(chunks))}, asset_map)
+
+            if write_if_changed(dest_path, html) and verbosity > 0:
+                print(f"Writing listing {dest_path}")
+
+            written.append(dest_path)
+            listings.append((listing_url(section_url, number),
+                             max((p["updated"] for p in chunk), default=0)))
+
+        feed_url = listing_url(section_url, 1)
+        write_rss(path.join(section_dir, RSS_NAME), base_url, title,
+                  feed_url, posts)
+        write_atom(path.join(section_dir, ATOM_NAME), base_url, title,
+                   feed_url, posts, posts[0]["updated"] if posts else 0)
+        written.extend([path.join(section_dir, RSS_NAME),
+                        path.join(section_dir, ATOM_NAME)])
+
+    sitemap_path = path.join(pub_dir_path, SITEMAP_NAME)
+    write_sitemap(sitemap_path, base_url, chain(
+        ((p["url"], p["updated"]) for _, p in sorted(
+            page_index.pages.items())),
+        listings))
+    written.append(sitemap_path)
+
+    if manifest is not None:
+        for output in written:
+            manifest.record_output(output)
+
+
+def build_search_index(pages: List[Tuple[str, str, str]], pub_dir_path,
+                       index: SearchIndex, manifest: Manifest = None):
+    hash_func = hash_file if manifest is None else manifest.hash
+    index.retain(s for s, _, _ in pages)
+
+    # Pages rendered in this build were indexed from their rendered trees
+    for s, d, _ in pages:
+        digest = hash_func(s)
+
+        if index.is_fresh(s, digest):
+            continue
+
+        if verbosity > 0:
+            print(f"Indexing {s}")
+
+        with open(s, 'r') as f:
+            if path.getsize(s) >= stream_threshold:
+                meta, first_line = read_front_matter(f)
+                title = page_title(meta, first_line)
+                terms = term_frequencies(
+                    markdown_lines_to_html_node(chain([first_line], f)))
+            else:
+                meta, markdown = split_front_matter(f.read())
+                title = page_title(meta, markdown)
+                terms = term_frequencies(parse_cache.parse(markdown))
+
+        index.update(s, digest, output_url(d, pub_dir_path), title, terms)
+
+    for output in index.write(path.join(pub_dir_path, SEARCH_DIR_NAME)):
+        if manifest is not None:
+            manifest.record_output(output)
+
+    index.save()
+
+
+def resolve_template(page_path, dir_path_content, template_path):
+    dir_path = path.dirname(page_path)
+
+    while True:
+        candidate = path.join(dir_path, TEMPLATE_NAME)
+
+        if path.isfile(candidate):
+            return candidate
+
+        if path.normpath(dir_path) == path.normpath(dir_path_content):
+            return template_path
+
+        dir_path = path.dirname(dir_path)
+
+
+def render_page(from_path, template_path, dest_path,
+                graph: DependencyGraph = None):
+    info = generate_page(from_path, template_path, dest_path)
+
+    if graph is not None:
+        inputs = ([METADATA_TABLE_PATH] if queries_metadata(template_path)
+                  else [])
+        graph.add(dest_path, from_path, template_path, inputs, info["links"],
+                  info["images"])
+
+
+def rebuild_changed(changed: Iterable[str], graph: DependencyGraph = None):
+    changed = sorted(changed)
+    requeried = []
+
+    if any(is_within(p, CONTENT_DIR_PATH) and p.endswith(".md")
+           for p in changed):
+        metadata = MetadataIndex(METADATA_INDEX_PATH, METADATA_TABLE_PATH)
+
+        if refresh_metadata(metadata, collect_pages(
+                CONTENT_DIR_PATH, PUB_DIR_PATH, TEMPLATE_PATH),
+                PUB_DIR_PATH) and graph is not None:
+            requeried = graph.affected([METADATA_TABLE_PATH])
+
+        metadata.save()
+
+    for d in requeried:
+        render_page(graph.outputs[d]["source"], graph.outputs[d]["template"],
+                    d, graph)
+
+    for changed_path in changed:
+        try:
+            if is_within(changed_path, STATIC_DIR_PATH):
+                sync_static_file(changed_path)
+            elif is_within(changed_path, CONTENT_DIR_PATH):
+                rebuild_content_path(changed_path, graph)
+            elif graph is not None:
+                for d in graph.affected([changed_path]):
+                    s = graph.outputs[d]["source"]
+                    render_page(s, graph.outputs[d]["template"], d, graph)
+            elif changed_path == TEMPLATE_PATH:
+                for s, d, t in collect_pages(CONTENT_DIR_PATH, PUB_DIR_PATH,
+                                             TEMPLATE_PATH):
+                    if t == TEMPLATE_PATH:
+                        render_page(s, t, d)
+        except Exception as e:
+            print(f"Failed to rebuild {changed_path}: {e}")
+
+    if graph is not None:
+        graph.save()
+
+
+def rebuild_content_path(changed_path, graph: DependencyGraph = None):
+    rel_path = path.relpath(changed_path, CONTENT_DIR_PATH)
+    dest_path = path.join(PUB_DIR_PATH, rel_path)
+
+    if path.basename(changed_path) == TEMPLATE_NAME:
+        dir_path = path.dirname(changed_path)
+
+        if not path.isdir(dir_path):
+            return
+
+        template_path = resolve_template(changed_path, CONTENT_DIR_PATH,
+                                         TEMPLATE_PATH)
+
+        for s, d, t in collect_pages(dir_path, path.dirname(dest_path),
+                                     template_path):
+            render_page(s, t, d, graph)
+    elif changed_path.endswith(".md"):
+        dest_path = dest_path[:-2]+"html"
+
+        if path.isfile(changed_path):
+            makedirs(path.dirname(dest_path), exist_ok=True)
+            render_page(changed_path,
+                        resolve_template(changed_path, CONTENT_DIR_PATH,
+                                         TEMPLATE_PATH),
+                        dest_path, graph)
+        elif path.isfile(dest_path):
+            print(f"Removing {dest_path}")
+            remove(dest_path)
+
+            if graph is not None:
+                graph.remove(dest_path)
+    elif not path.exists(changed_path) and path.isdir(dest_path):
+        print(f"Removing {dest_path}")
+        rmtree(dest_path)
+
+        if graph is not None:
+            graph.retain(d for d in graph.outputs
+                         if not is_within(d, dest_path))
+
+
+def sync_static_file(changed_path):
+    dest_path = path.join(PUB_DIR_PATH,
+                          path.relpath(changed_path, STATIC_DIR_PATH))
+
+    if path.isfile(changed_path):
+        print(f"Copying {changed_path} to {dest_path}")
+        makedirs(path.dirname(dest_path), exist_ok=True)
+        place_file(changed_path, dest_path)
+    elif path.isdir(dest_path):
+        print(f"Removing {dest_path}")
+        rmtree(dest_path)
+    elif path.exists(dest_path):
+        print(f"Removing {dest_path}")
+        remove(dest_path)
+
+
+def is_within(file_path, dir_path):
+    return path.commonpath([path.abspath(file_path),
+                            path.abspath(dir_path)]) == path.abspath(dir_path)
+
+
+def serve(port: int, watch: bool):
+    handler = partial(SimpleHTTPRequestHandler, directory=PUB_DIR_PATH)
+    server = ThreadingHTTPServer(("", port), handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {PUB_DIR_PATH} on http://localhost:{port}")
+
+    try:
+        if not watch:
+            while True:
+                sleep(3600)
+
+        watcher = create_watcher([CONTENT_DIR_PATH, STATIC_DIR_PATH,
+                                  TEMPLATE_PATH])
+        graph = DependencyGraph(DEPENDENCY_GRAPH_PATH, PUB_DIR_PATH)
+
+        while True:
+            changed = watcher.poll()
+
+            if changed:
+                started = perf_counter()
+                rebuild_changed(changed, graph)
+                print(f"Rebuilt {len(changed)} changed path(s) in "
+                      f"{(perf_counter() - started) * 1000:.1f}ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def write_profile(profile: BuildProfile, args):
+    if args.profile:
+        print(profile.summary_table())
+        print()
+        print(profile.slowest_table(args.slowest))
+
+    if args.profile_json:
+        with open(args.profile_json, 'w') as f:
+            json.dump(profile.to_json(), f, indent=1)
+
+    if args.trace:
+        with open(args.trace, 'w') as f:
+            json.dump(profile.chrome_trace(), f)
+
+
+def print_dependencies(target: str = None):
+    graph = DependencyGraph(DEPENDENCY_GRAPH_PATH, PUB_DIR_PATH)
+
+    if not graph.outputs:
+        print(f"No dependency graph at {DEPENDENCY_GRAPH_PATH}, "
+              "run a build first")
+        return
+
+    if target is None:
+        linked_from = graph.reverse_links()
+
+        for output in sorted(graph.outputs):
+            print(f"{output}: {len(graph.dependencies(output))} input(s), "
+                  f"{len(graph.links_to(output))} link(s), "
+                  f"linked from {len(linked_from.get(output, []))}")
+        return
+
+    if not path.isabs(target):
+        target = path.join(".", path.normpath(target))
+
+    lines = graph.describe(target)
+
+    if not lines:
+        print(f"Nothing in the dependency graph refers to {target}")
+
+    for line in lines:
+        print(line)
 
 
 def main():
-    copy_static_content()
+    arg_parser = ArgumentParser(description="Build the site into public/")
+    arg_parser.add_argument("command", nargs="?", default="build",
+                            choices=["build", "serve", "deps", "merge"],
+                            help="build the site, build and serve it, "
+                            "show the dependency graph of the last build, "
+                            "or merge the outputs of a sharded build")
+    arg_parser.add_argument("target", nargs="?",
+                            help="with deps, the page, template or output "
+                            "to explain")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="rebuild only outputs whose inputs changed")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="render pages in N processes (0: all cores)")
+    arg_parser.add_argument("--parse-cache", action="store_true",
+                            help="keep parsed pages under .cache/parse")
+    arg_parser.add_argument("--static-checksum", action="store_true",
+                            help="with --incremental, compare static files "
+                            "by content instead of size and mtime")
+    arg_parser.add_argument("--link", choices=LINK_MODES, default="reflink",
+                            help="with --incremental, how static files are "
+                            "placed in public/ (default: reflink, falling "
+                            "back to a copy)")
+    arg_parser.add_argument("--fingerprint", action="store_true",
+                            help="publish static files under content-hashed "
+                            "names and point pages at them")
+    arg_parser.add_argument("--compress", action="store_true",
+                            help="write .gz (and .br when the brotli module "
+                            "is installed) next to compressible outputs")
+    arg_parser.add_argument("--minify", action="store_true",
+                            help="collapse insignificant whitespace in pages "
+                            "and minify static CSS")
+    arg_parser.add_argument("--search", action="store_true",
+                            help="write a sharded search index of all "
+                            "pages to public/search/")
+    arg_parser.add_argument("--collections", action="store_true",
+                            help="write paginated listings and RSS/Atom "
+                            "feeds for sections without an index page, and "
+                            "a sitemap.xml")
+    arg_parser.add_argument("--base-url", default=BASE_URL,
+                            help="absolute site URL used in the sitemap and "
+                            "feeds (default: %(default)s)")
+    arg_parser.add_argument("--page-size", type=int, default=10,
+                            help="entries per listing page (default: "
+                            "%(default)s)")
+    arg_parser.add_argument("--io-threads", type=int, default=0,
+                            help="without -j, read sources ahead of and "
+                            "write pages behind the renderer in N threads, "
+                            "for slow or network storage; pages below "
+                            "--stream-threshold are buffered while queued "
+                            "(default: %(default)s, plain serial loop)")
+    arg_parser.add_argument("--images", action="store_true",
+                            help="publish resized variants of static images "
+                            "(needs Pillow) and give <img> tags srcset, "
+                            "width, height and loading=lazy")
+    arg_parser.add_argument("--image-widths", default=",".join(
+                                str(w) for w in WIDTHS),
+                            help="comma separated variant widths (default: "
+                            "%(default)s)")
+    arg_parser.add_argument("--shard", type=parse_shard,
+                            help="render only the I-th of N size balanced "
+                            "parts of the content into shards/I-of-N/; "
+                            "search, collections and compression run in "
+                            "merge")
+    arg_parser.add_argument("--check-links", action="store_true",
+                            help="report dangling internal links, broken "
+                            "images and pages nothing links to; fails the "
+                            "build on the first two")
+    arg_parser.add_argument("--stream-threshold", type=float,
+                            default=STREAM_THRESHOLD / 2**20,
+                            help="render markdown files of at least this "
+                            "many MiB block by block instead of loading "
+                            "them whole (default: %(default)g)")
+    arg_parser.add_argument("-v", "--verbose", action="count", default=0,
+                            help="print every generated page")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="print time spent per build stage")
+    arg_parser.add_argument("--slowest", type=int, default=10,
+                            help="with --profile, list the N slowest pages")
+    arg_parser.add_argument("--profile-json",
+                            help="write per-stage and per-page timings here")
+    arg_parser.add_argument("--trace",
+                            help="write a Chrome trace of the build here")
+    arg_parser.add_argument("--watch", action="store_true",
+                            help="with serve, rebuild what changes on disk")
+    arg_parser.add_argument("--port", type=int, default=8888,
+                            help="port for serve (default: 8888)")
+    args = arg_parser.parse_args()
+
+    if args.command == "deps":
+        print_dependencies(args.target)
+        return
+
+    if args.shard is not None and args.command != "build":
+        arg_parser.error("--shard only applies to build")
+
+    if args.parse_cache:
+        configure_parse_cache(PARSE_CACHE_DIR_PATH)
+
+    set_verbosity(args.verbose)
+    set_stream_threshold(int(args.stream_threshold * 2**20))
+
+    profile = None
+
+    if args.profile or args.profile_json or args.trace:
+        profile = BuildProfile()
+
+    options = BuildOptions(incremental=args.incremental,
+                           jobs=args.jobs or cpu_count(),
+                           profile=profile,
+                           static_checksum=args.static_checksum,
+                           link=args.link,
+                           fingerprint=args.fingerprint,
+                           compress=args.compress,
+                           minify=args.minify,
+                           search=args.search,
+                           collections=args.collections,
+                           base_url=args.base_url.rstrip("/"),
+                           page_size=args.page_size,
+                           io_threads=args.io_threads,
+                           images=args.images,
+                           image_widths=[int(w) for w in
+                                         args.image_widths.split(",")],
+                           shard=args.shard,
+                           check_links=args.check_links)
+
+    if args.command == "merge":
+        try:
+            report = merge_shards(options)
+        except ValueError as e:
+            arg_parser.error(str(e))
+    else:
+        report = copy_static_content(options)
+
+    if profile is not None:
+        write_profile(profile, args)
+
+    if args.command == "serve":
+        set_asset_map({})
+        serve(args.port, args.watch)
+    elif report is not None and not report.ok():
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import hashlib
+import json
+from os import listdir, makedirs, path, remove, rmdir, stat
+from typing import Dict, Iterable, List
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def code_version(src_dir_path: str = path.dirname(path.abspath(__file__))):
+    digest = hashlib.sha256()
+
+    for name in sorted(listdir(src_dir_path)):
+        if name.endswith(".py") and not name.startswith("test_"):
+            digest.update(name.encode())
+            digest.update(hash_file(path.join(src_dir_path, name)).encode())
+
+    return digest.hexdigest()
+
+
+class Manifest():
+    def __init__(self, manifest_path: str, version: str):
+        self.path = manifest_path
+        self.version = version
+        self.outputs: Dict[str, Dict[str, str]] = {}
+        self.files: Dict[str, List] = {}
+
+        self._previous_outputs: Dict[str, Dict[str, str]] = {}
+        self._previous_files: Dict[str, List] = {}
+        self._valid = False
+
+        if path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                data = json.load(f)
+
+            self._previous_outputs = data.get("outputs", {})
+            self._previous_files = data.get("files", {})
+            self._valid = data.get("version") == version
+
+    def hash(self, file_path: str) -> str:
+        if file_path in self.files:
+            return self.files[file_path][2]
+
+        st = stat(file_path)
+        previous = self._previous_files.get(file_path)
+
+        if (previous is not None and
+                previous[0] == st.st_size and previous[1] == st.st_mtime_ns):
+            digest = previous[2]
+        else:
+            digest = hash_file(file_path)
+
+        self.files[file_path] = [st.st_size, st.st_mtime_ns, digest]
+
+        return digest
+
+    def is_fresh(self, output: str, inputs: Iterable[str]) -> bool:
+        previous = self._previous_outputs.get(output)
+
+        if not self._valid or previous is None or not path.exists(output):
+            return False
+
+        return previous == {i: self.hash(i) for i in inputs}
+
+    def record(self, output: str, inputs: Iterable[str]):
+        self.outputs[output] = {i: self.hash(i) for i in inputs}
+
+    def record_output(self, output: str):
+        self.outputs[output] = {}
+
+    def stale_outputs(self) -> List[str]:
+        return [o for o in self._previous_outputs if o not in self.outputs]
+
+    def remove_stale(self, root_dir_path: str) -> List[str]:
+        root_dir_path = path.normpath(root_dir_path)
+        removed = []
+
+        for output in self.stale_outputs():
+            if not path.exists(output):
+                continue
+
+            remove(output)
+            removed.append(output)
+
+            parent = path.dirname(path.normpath(output))
+
+            while (parent != root_dir_path and
+                   parent.startswith(root_dir_path) and
+                   not listdir(parent)):
+                rmdir(parent)
+                parent = path.dirname(parent)
+
+        return removed
+
+    def save(self):
+        makedirs(path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            json.dump({"version": self.version,
+                       "outputs": self.outputs,
+                       "files": self.files}, f, indent=1, sort_keys=True)
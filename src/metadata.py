@@ -0,0 +1,247 @@
+import json
+import re
+from datetime import datetime, timezone
+from os import makedirs, path, stat
+from typing import Dict, Iterable, List, TextIO, Tuple, Union
+
+from assets import write_if_changed
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+from parser import extract_title
+
+FENCE = "---"
+
+ENTRY = re.compile(r"([\w-]+)\s*:\s*(.*)")
+BLANK_LINES = re.compile(r"(?:[ \t]*\r?\n)+")
+LIST_ITEM = re.compile(r"\s*-\s+(.*)")
+
+Value = Union[str, List[str]]
+
+
+def unquote(value: str) -> str:
+    value = value.strip()
+
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+
+    return value
+
+
+def parse_value(value: str) -> Value:
+    value = value.strip()
+
+    if value.startswith("[") and value.endswith("]"):
+        return [unquote(v) for v in value[1:-1].split(",") if v.strip()]
+
+    return unquote(value)
+
+
+def parse_front_matter(lines: Iterable[str]) -> Dict[str, Value]:
+    meta = {}
+    key = None
+
+    for line in lines:
+        line = line.rstrip("\n")
+
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+
+        item = LIST_ITEM.match(line)
+
+        if item is not None and key is not None:
+            if not isinstance(meta[key], list):
+                meta[key] = []
+
+            meta[key].append(unquote(item.group(1)))
+            continue
+
+        entry = ENTRY.match(line)
+
+        if entry is None:
+            raise ValueError(f"Invalid front matter line: {line}")
+
+        key = entry.group(1)
+        meta[key] = parse_value(entry.group(2))
+
+    return meta
+
+
+def read_front_matter(f: TextIO) -> Tuple[Dict[str, Value], str]:
+    first_line = f.readline()
+
+    if first_line.rstrip() != FENCE:
+        return {}, first_line
+
+    lines = []
+
+    for line in f:
+        if line.rstrip() == FENCE:
+            first_line = f.readline()
+
+            while first_line and not first_line.strip():
+                first_line = f.readline()
+
+            return parse_front_matter(lines), first_line
+
+        lines.append(line)
+
+    raise ValueError("Front matter is not closed")
+
+
+def split_front_matter(markdown: str) -> Tuple[Dict[str, Value], str]:
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+
+    end = markdown.find("\n")
+
+    if markdown[:end].rstrip() != FENCE:
+        return {}, markdown
+
+    close = re.compile(rf"^{FENCE}[ \t]*$", re.M).search(markdown, end + 1)
+
+    if close is None:
+        raise ValueError("Front matter is not closed")
+
+    body_start = markdown.find("\n", close.end())
+    body = "" if body_start < 0 else markdown[body_start + 1:]
+    blank_lines = BLANK_LINES.match(body)
+
+    if blank_lines is not None:
+        body = body[blank_lines.end():]
+
+    return parse_front_matter(markdown[end + 1:close.start()]
+                              .splitlines()), body
+
+
+def page_title(meta: Dict[str, Value], first_line: str) -> str:
+    title = meta.get("title")
+
+    if isinstance(title, str) and title:
+        return title
+
+    return extract_title(first_line)
+
+
+def page_date(meta: Dict[str, Value]) -> float:
+    value = meta.get("date")
+
+    if value is None:
+        return None
+
+    try:
+        date = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid front matter date: {value}")
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return date.timestamp()
+
+
+class MetadataIndex():
+    def __init__(self, index_path: str, table_path: str):
+        self.path = index_path
+        self.table_path = table_path
+        self.stats: Dict[str, List[int]] = {}
+        self.pages: Dict[str, Dict] = {}
+
+        if path.exists(index_path):
+            with open(index_path, 'r') as f:
+                data = json.load(f)
+
+            self.stats = data.get("stats", {})
+            self.pages = data.get("pages", {})
+
+    def refresh(self, pages: Iterable[Tuple[str, str]]) -> List[str]:
+        pages = list(pages)
+        sources = {s for s, _ in pages}
+        changed = [s for s in self.pages if s not in sources]
+
+        for s in changed:
+            del self.pages[s]
+            self.stats.pop(s, None)
+
+        for s, url in pages:
+            st = stat(s)
+            signature = [st.st_size, st.st_mtime_ns]
+
+            if (self.stats.get(s) == signature and s in self.pages and
+                    self.pages[s]["url"] == url):
+                continue
+
+            with open(s, 'r') as f:
+                meta, first_line = read_front_matter(f)
+
+            try:
+                title = page_title(meta, first_line)
+            except ValueError:
+                title = None
+
+            self.stats[s] = signature
+            self.pages[s] = {"url": url, "title": title, "meta": meta}
+            changed.append(s)
+
+        return changed
+
+    def write_table(self) -> bool:
+        makedirs(path.dirname(self.table_path) or ".", exist_ok=True)
+
+        return write_if_changed(self.table_path, json.dumps(
+            self.pages, indent=1, sort_keys=True))
+
+    def save(self):
+        makedirs(path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            json.dump({"stats": self.stats, "pages": self.pages}, f,
+                      indent=1, sort_keys=True)
+
+
+def query(pages: Dict[str, Dict], arguments: Dict[str, str]) -> List[Dict]:
+    arguments = dict(arguments)
+    section = arguments.pop("section", None)
+    sort = arguments.pop("sort", "title")
+    limit = arguments.pop("limit", None)
+    entries = []
+
+    for entry in pages.values():
+        if section is not None and not is_in_section(entry["url"], section):
+            continue
+
+        if all(matches(entry["meta"].get(k), v)
+               for k, v in arguments.items()):
+            entries.append({**entry["meta"], "url": entry["url"],
+                            "title": entry["title"] or entry["url"]})
+
+    key = sort.lstrip("-")
+    entries.sort(key=lambda e: (str(e.get(key, "")), e["url"]),
+                 reverse=sort.startswith("-"))
+
+    if limit is not None:
+        entries = entries[:int(limit)]
+
+    return entries
+
+
+def is_in_section(url: str, section: str) -> bool:
+    section = "/" + section.strip("/")
+
+    return section == "/" or url == section or url.startswith(section + "/")
+
+
+def matches(value: Value, expected: str) -> bool:
+    if isinstance(value, list):
+        return expected in value
+
+    return value == expected
+
+
+def pages_node(entries: List[Dict]) -> Union[HTMLNode, str]:
+    if not entries:
+        return ""
+
+    return ParentNode("ul", [
+        ParentNode("li", [LeafNode("a", e["title"], {"href": e["url"]})])
+        for e in entries])
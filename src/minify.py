@@ -0,0 +1,112 @@
+import re
+from typing import TextIO
+
+PRESERVED_TAGS = "pre|textarea|script|style"
+PRESERVED_BLOCK = re.compile(rf"(<({PRESERVED_TAGS})\b.*?</\2\s*>)",
+                             re.S | re.I)
+PRESERVED_OPEN = re.compile(rf"<({PRESERVED_TAGS})[\s>]", re.I)
+PRESERVED_CLOSE = re.compile(rf"</({PRESERVED_TAGS})\s*>", re.I)
+
+BLOCK_TAGS = {"address", "article", "aside", "base", "blockquote", "body",
+              "dd", "details", "dialog", "div", "dl", "doctype", "dt",
+              "fieldset", "figcaption", "figure", "footer", "form", "h1",
+              "h2", "h3", "h4", "h5", "h6", "head", "header", "hgroup", "hr",
+              "html", "li", "link", "main", "meta", "nav", "noscript", "ol",
+              "option", "p", "pre", "script", "section", "style", "summary",
+              "table", "tbody", "td", "template", "tfoot", "th", "thead",
+              "title", "tr", "ul"}
+
+WHITESPACE = re.compile(r"\s+")
+WHITESPACE_RUN = re.compile(r"\s{2,}|[\t\n\r\f\v]")
+INDENTATION = re.compile(r"(<[/!]?([A-Za-z][\w-]*)[^<>]*>)\s*\n\s*"
+                         r"(?=<[/!]?([A-Za-z][\w-]*))")
+
+CSS_TOKEN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')"
+                       r"|(/\*.*?\*/)|(\s+)", re.S)
+CSS_SPACE_BEFORE = set("{};,>")
+CSS_SPACE_AFTER = set("{};,>:")
+
+
+def join_tags(match: re.Match) -> str:
+    if (match.group(2).lower() in BLOCK_TAGS and
+            match.group(3).lower() in BLOCK_TAGS):
+        return match.group(1)
+
+    return match.group(1) + " "
+
+
+def minify_html(html: str) -> str:
+    parts = PRESERVED_BLOCK.split(html)
+    minified = []
+
+    for i in range(0, len(parts), 3):
+        before = f"</{parts[i - 1]}>" if i > 0 else ""
+        after = f"<{parts[i + 2]}>" if i + 1 < len(parts) else ""
+        text = INDENTATION.sub(join_tags, before + parts[i] + after)
+        text = text[len(before):len(text) - len(after)]
+        minified.append(WHITESPACE.sub(" ", text))
+
+        if i + 1 < len(parts):
+            minified.append(parts[i + 1])
+
+    return "".join(minified)
+
+
+def minify_text(text: str) -> str:
+    if WHITESPACE_RUN.search(text) is None:
+        return text
+
+    return WHITESPACE.sub(" ", text)
+
+
+class MinifyingWriter():
+    def __init__(self, writer: TextIO):
+        self.writer = writer
+        self.preserved = 0
+        self.trailing_space = False
+
+    def minify(self, fragment: str) -> str:
+        is_tag = fragment.startswith("<") and fragment.endswith(">")
+
+        if is_tag and PRESERVED_OPEN.match(fragment):
+            self.preserved += 1
+        elif is_tag and self.preserved and PRESERVED_CLOSE.match(fragment):
+            self.preserved -= 1
+        elif not is_tag and not self.preserved and fragment:
+            fragment = minify_text(fragment)
+
+            if self.trailing_space and fragment.startswith(" "):
+                fragment = fragment[1:]
+
+            if fragment:
+                self.trailing_space = fragment.endswith(" ")
+
+            return fragment
+
+        self.trailing_space = False
+
+        return fragment
+
+    def write(self, fragment: str):
+        fragment = self.minify(fragment)
+
+        if fragment:
+            self.writer.write(fragment)
+
+
+def minify_css(css: str) -> str:
+    css = CSS_TOKEN.sub(lambda m: "" if m.group(2) else m.group(0), css)
+
+    def replace(match: re.Match) -> str:
+        if match.group(1):
+            return match.group(1)
+
+        before = css[match.start() - 1] if match.start() > 0 else "{"
+        after = css[match.end()] if match.end() < len(css) else "}"
+
+        if before in CSS_SPACE_AFTER or after in CSS_SPACE_BEFORE:
+            return ""
+
+        return " "
+
+    return CSS_TOKEN.sub(replace, css).replace(";}", "}").strip()
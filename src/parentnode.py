@@ -1,24 +1,33 @@
-from typing import Dict, List
-from htmlnode import HTMLNode
+from typing import Callable, Dict, List
+from htmlnode import END_TAGS, HTMLNode, end_tag
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self,
                  tag: str,
                  children: List[HTMLNode],
                  props: Dict = None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
+    def write_html(self, write: Callable[[str], object]):
+        tag = self.tag
+
+        if tag is None:
             raise ValueError("Tag argument required")
 
         if self.children is None or len(self.children) < 1:
             raise ValueError("Children argument required")
 
-        children_str = ""
+        start = self._start_tag
+
+        if start is None:
+            start = self.start_tag()
+
+        write(start)
 
         for c in self.children:
-            children_str += c.to_html()
+            c.write_html(write)
 
-        return f"<{self.tag}{self.props_to_html()}>{children_str}</{self.tag}>"
+        write(END_TAGS.get(tag) or end_tag(tag))
@@ -1,8 +1,9 @@
 
 import re
 from enum import Enum
-from typing import List
+from typing import Callable, Iterable, Iterator, List
 
+from htmlnode import end_tag
 from leafnode import LeafNode
 from parentnode import ParentNode
 from textnode import TextNode, TextType, text_node_to_html_node
@@ -122,7 +123,110 @@ def split_nodes_link(old_nodes: List[TextNode]) -> List[TextNode]:
     return new_nodes
 
 
+_INLINE_DELIMITER = re.compile(r"\*\*|\*|`")
+_INLINE_REFERENCE = re.compile(r"(!?)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_INLINE_LEVEL = {TextType.BOLD: 0, TextType.ITALIC: 1, TextType.CODE: 2}
+
+
+def scan_inline(text: str) -> List[TextNode]:
+    spans = []
+    i = 0
+
+    while True:
+        delimiter = _INLINE_DELIMITER.search(text, i)
+
+        if delimiter is None:
+            break
+
+        start = delimiter.start()
+
+        match delimiter.group():
+            case "**":
+                end = text.find("**", start + 2)
+
+                if end < 0:
+                    raise Exception("Invalid Markdown syntax")
+
+                spans.append((TextType.BOLD, start, end + 2))
+                i = end + 2
+            case "*":
+                end = text.find("*", start + 1)
+
+                if end < 0 or text.startswith("**", end):
+                    raise Exception("Invalid Markdown syntax")
+
+                spans.append((TextType.ITALIC, start, end + 1))
+                i = end + 1
+            case _:
+                end = text.find("`", start + 1)
+
+                if end < 0 or text.find("*", start, end) >= 0:
+                    raise Exception("Invalid Markdown syntax")
+
+                spans.append((TextType.CODE, start, end + 1))
+                i = end + 1
+
+    nodes = []
+    _emit_inline(text, 0, len(text), spans, nodes)
+
+    return nodes
+
+
+def _emit_inline(text: str, start: int, end: int, spans, nodes):
+    if not spans:
+        _append_inline(nodes, text[start:end], TextType.TEXT)
+        return
+
+    level = min(_INLINE_LEVEL[text_type] for text_type, _, _ in spans)
+    inner = []
+
+    for span in spans:
+        text_type, span_start, span_end = span
+
+        if _INLINE_LEVEL[text_type] != level:
+            inner.append(span)
+            continue
+
+        _emit_inline(text, start, span_start, inner, nodes)
+        _append_inline(nodes, text[span_start:span_end], text_type)
+        start = span_end
+        inner = []
+
+    if start != end:
+        _emit_inline(text, start, end, inner, nodes)
+
+
+def _append_inline(nodes: List[TextNode], text: str, text_type: TextType):
+    if "[" not in text:
+        nodes.append(TextNode(text, text_type))
+        return
+
+    i = 0
+    found = False
+
+    for match in _INLINE_REFERENCE.finditer(text):
+        found = True
+
+        if match.start() != i:
+            nodes.append(TextNode(text[i:match.start()], TextType.TEXT))
+
+        nodes.append(TextNode(match.group(2),
+                              TextType.IMAGE if match.group(1)
+                              else TextType.LINK,
+                              match.group(3)))
+        i = match.end()
+
+    if not found:
+        nodes.append(TextNode(text, text_type))
+    elif i != len(text):
+        nodes.append(TextNode(text[i:], TextType.TEXT))
+
+
 def text_to_textnodes(text) -> List[TextNode]:
+    return scan_inline(text)
+
+
+def split_text_to_textnodes(text) -> List[TextNode]:
     bold_nodes = split_nodes_delimiter(
         [TextNode(text, TextType.TEXT)], "**", TextType.BOLD)
     italic_nodes = split_nodes_delimiter(
@@ -143,33 +247,108 @@ def extract_markdown_links(text):
 
 
 def markdown_to_blocks(markdown: str) -> List[str]:
+    if "```" in markdown:
+        return list(iter_markdown_blocks(markdown.split("\n")))
+
     return (list(
         filter(lambda block: block,
                map(lambda block: block.strip(), markdown.split("\n\n")))))
 
 
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    block = []
+    fenced = False
+
+    for line in lines:
+        line = line.rstrip("\n")
+
+        if line.startswith("```") and line.count("```") % 2 == 1:
+            fenced = not fenced
+
+        if line or fenced:
+            block.append(line)
+            continue
+
+        if block:
+            text = "\n".join(block).strip()
+            block = []
+
+            if text:
+                yield text
+
+    if block:
+        text = "\n".join(block).strip()
+
+        if text:
+            yield text
+
+
+_HEADING = re.compile(r"#{1,6}\s")
+_CODE = re.compile(r"```[\S\s]+```$")
+_UNORDERED_LIST = re.compile(r"[\*-]\s")
+_ORDERED_LIST = re.compile(r"\d+\.\s")
+
+_BLOCK_CHECKS = {
+    "#": (_HEADING.match, BlockType.HEADING),
+    "`": (_CODE.match, BlockType.CODE),
+    ">": (None, BlockType.QUOTE),
+    "*": (_UNORDERED_LIST.match, BlockType.UNORDERED_LIST),
+    "-": (_UNORDERED_LIST.match, BlockType.UNORDERED_LIST),
+}
+
+
 def block_to_block_type(block: str):
-    if re.match(r"^#{1,6}\s", block):
-        return BlockType.HEADING
-    if re.match(r"^```[\S\s]+```$", block):
-        return BlockType.CODE
-    if re.match(r"^>", block):
-        return BlockType.QUOTE
-    if re.match(r"^[\*-]\s", block):
-        return BlockType.UNORDERED_LIST
-    if re.match(r"^\d+\.\s", block):
-        return BlockType.ORDERED_LIST
+    check = _BLOCK_CHECKS.get(block[:1])
+
+    if check is None:
+        if not block[:1].isdigit():
+            return BlockType.PARAGRAPH
+
+        check = (_ORDERED_LIST.match, BlockType.ORDERED_LIST)
+
+    match, block_type = check
+
+    if match is None or match(block):
+        return block_type
+
     return BlockType.PARAGRAPH
 
 
+def extract_title(markdown: str):
+    end = markdown.find("\n")
+    first_line = markdown if end < 0 else markdown[:end]
+
+    if first_line.startswith("# ") and len(first_line) > 2:
+        return first_line[2:].strip()
+
+    raise ValueError("No H1 Heading found")
+
+
 def markdown_to_html_node(markdown):
     content = list(map(block_to_html_node, markdown_to_blocks(markdown)))
 
     return ParentNode("div", content)
 
 
-def block_to_html_node(block: str) -> ParentNode:
-    match(block_to_block_type(block)):
+class StreamedNode(ParentNode):
+    __slots__ = ()
+
+    def write_html(self, write: Callable[[str], object]):
+        write(self.start_tag())
+
+        for c in self.children:
+            c.write_html(write)
+
+        write(end_tag(self.tag))
+
+
+def markdown_lines_to_html_node(lines: Iterable[str]) -> StreamedNode:
+    return StreamedNode("div", map(block_to_html_node,
+                                   iter_markdown_blocks(lines)))
+
+
+def block_to_html_node(block: str, block_type: BlockType = None) -> ParentNode:
+    match(block_type or block_to_block_type(block)):
         case BlockType.PARAGRAPH:
             return block_to_paragraph_node(block)
         case BlockType.HEADING:
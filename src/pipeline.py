@@ -0,0 +1,36 @@
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Iterable, Iterator, Tuple
+
+
+def prefetch(executor: Executor, func: Callable, items: Iterable,
+             depth: int) -> Iterator[Tuple[Any, Any]]:
+    pending: Deque[Tuple[Any, Future]] = deque()
+
+    for item in items:
+        pending.append((item, executor.submit(func, item)))
+
+        if len(pending) >= depth:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+class BoundedWriter():
+    def __init__(self, executor: Executor, depth: int):
+        self.executor = executor
+        self.depth = depth
+        self.pending: Deque[Future] = deque()
+
+    def submit(self, func: Callable, *args):
+        self.pending.append(self.executor.submit(func, *args))
+
+        while len(self.pending) > self.depth:
+            self.pending.popleft().result()
+
+    def drain(self):
+        while self.pending:
+            self.pending.popleft().result()
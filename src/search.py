@@ -0,0 +1,172 @@
+import json
+import re
+from os import makedirs, path, remove
+from typing import Dict, Iterable, Iterator, List, Set
+
+from assets import write_if_changed
+from htmlnode import HTMLNode
+
+TERM = re.compile(r"\w{2,}")
+
+OTHER_SHARD = "_"
+INDEX_NAME = "index.json"
+
+
+def node_text(node: HTMLNode) -> Iterator[str]:
+    if node.children:
+        for child in node.children:
+            yield from node_text(child)
+    elif node.value:
+        yield node.value
+
+    if node.props and node.props.get("alt"):
+        yield node.props["alt"]
+
+
+def tokenize(text: str) -> List[str]:
+    return TERM.findall(text.lower())
+
+
+def term_frequencies(node: HTMLNode,
+                     counts: Dict[str, int] = None) -> Dict[str, int]:
+    counts = {} if counts is None else counts
+
+    for text in node_text(node):
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+
+    return counts
+
+
+def count_terms(nodes: Iterable[HTMLNode],
+                counts: Dict[str, int]) -> Iterator[HTMLNode]:
+    for node in nodes:
+        yield node
+        term_frequencies(node, counts)
+
+
+def shard_name(term: str) -> str:
+    first = term[0]
+
+    if first.isascii() and first.isalnum():
+        return first
+
+    return OTHER_SHARD
+
+
+class SearchIndex():
+    def __init__(self, state_path: str, version: str):
+        self.path = state_path
+        self.version = version
+        self.pages: Dict[str, Dict] = {}
+
+        if path.exists(state_path):
+            with open(state_path, 'r') as f:
+                data = json.load(f)
+
+            if data.get("version") == version:
+                self.pages = data.get("pages", {})
+
+        self.dirty: Set[str] = set()
+        self._ids = {p["id"] for p in self.pages.values()}
+        self._next_id = 0
+
+    def is_fresh(self, source: str, digest: str) -> bool:
+        page = self.pages.get(source)
+
+        return page is not None and page["hash"] == digest
+
+    def update(self, source: str, digest: str, url: str, title: str,
+               terms: Dict[str, int]):
+        page = self.pages.get(source)
+        previous = {} if page is None else page["terms"]
+        page_id = page["id"] if page is not None else self._free_id()
+        self._ids.add(page_id)
+        self.dirty.update(shard_name(t) for t in terms.keys() | previous
+                          if terms.get(t) != previous.get(t))
+
+        self.pages[source] = {"id": page_id, "hash": digest, "url": url,
+                              "title": title, "terms": terms,
+                              "shards": sorted({shard_name(t)
+                                                for t in terms})}
+
+    def retain(self, sources: Iterable[str]):
+        sources = set(sources)
+
+        for source in list(self.pages):
+            if source not in sources:
+                page = self.pages.pop(source)
+                self._ids.discard(page["id"])
+                self._next_id = min(self._next_id, page["id"])
+                self.dirty.update(page["shards"])
+
+    def page_table(self) -> List:
+        table = [None] * (max((p["id"] for p in self.pages.values()),
+                              default=-1) + 1)
+
+        for page in self.pages.values():
+            table[page["id"]] = [page["url"], page["title"]]
+
+        return table
+
+    def shard_names(self) -> List[str]:
+        return sorted({name for page in self.pages.values()
+                       for name in page["shards"]})
+
+    def shards(self, names: Iterable[str] = None
+               ) -> Dict[str, Dict[str, List[List[int]]]]:
+        names = set(self.shard_names() if names is None else names)
+        shards = {}
+
+        for page in sorted(self.pages.values(), key=lambda p: p["id"]):
+            if names.isdisjoint(page["shards"]):
+                continue
+
+            for term, count in page["terms"].items():
+                name = shard_name(term)
+
+                if name in names:
+                    postings = shards.setdefault(name, {})
+                    postings.setdefault(term, []).append([page["id"], count])
+
+        return shards
+
+    def write(self, index_dir_path: str) -> List[str]:
+        makedirs(index_dir_path, exist_ok=True)
+        names = self.shard_names()
+        dirty = self.dirty | {n for n in names if not path.exists(
+            path.join(index_dir_path, f"{n}.json"))}
+
+        for name, postings in self.shards(dirty).items():
+            write_if_changed(path.join(index_dir_path, f"{name}.json"),
+                             json.dumps(postings, separators=(",", ":"),
+                                        sort_keys=True))
+
+        for name in dirty.difference(names):
+            shard_path = path.join(index_dir_path, f"{name}.json")
+
+            if path.exists(shard_path):
+                remove(shard_path)
+
+        self.dirty = set()
+        written = [path.join(index_dir_path, f"{n}.json") for n in names]
+        index_path = path.join(index_dir_path, INDEX_NAME)
+        write_if_changed(index_path, json.dumps(
+            {"pages": self.page_table(), "shards": names},
+            separators=(",", ":")))
+        written.append(index_path)
+
+        return written
+
+    def save(self):
+        makedirs(path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, 'w') as f:
+            json.dump({"version": self.version, "pages": self.pages}, f,
+                      sort_keys=True)
+
+    def _free_id(self) -> int:
+        while self._next_id in self._ids:
+            self._next_id += 1
+
+        return self._next_id
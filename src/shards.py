@@ -0,0 +1,96 @@
+import heapq
+import json
+import re
+from os import listdir, path
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from assets import write_if_changed
+
+SHARD_RECORD_NAME = "shard.json"
+SHARD_DIR_NAME = re.compile(r"(\d+)-of-(\d+)")
+
+T = TypeVar("T")
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    index, _, count = value.partition("/")
+    index, count = int(index), int(count)
+
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {value} is not between 1/{count} and "
+                         f"{count}/{count}")
+
+    return index, count
+
+
+def shard_name(shard: Tuple[int, int]) -> str:
+    return f"{shard[0]}-of-{shard[1]}"
+
+
+def partition(items: List[T], weight: Callable[[T], int],
+              count: int) -> List[List[T]]:
+    shards = [[] for _ in range(count)]
+    loads = [(0, i) for i in range(count)]
+
+    for w, item in sorted(((weight(item), item) for item in items),
+                          key=lambda e: (-e[0], e[1])):
+        load, i = heapq.heappop(loads)
+        shards[i].append(item)
+        heapq.heappush(loads, (load + w, i))
+
+    return shards
+
+
+def shard_pages(pages: List[Tuple[str, str, str]],
+                shard: Tuple[int, int]) -> List[Tuple[str, str, str]]:
+    selected = set(partition(pages, lambda p: path.getsize(p[0]),
+                             shard[1])[shard[0] - 1])
+
+    return [p for p in pages if p in selected]
+
+
+def find_shards(shards_dir_path: str) -> List[str]:
+    found = {}
+
+    if path.isdir(shards_dir_path):
+        for name in listdir(shards_dir_path):
+            match = SHARD_DIR_NAME.fullmatch(name)
+
+            if match is not None:
+                found[int(match.group(1)), int(match.group(2))] = path.join(
+                    shards_dir_path, name)
+
+    counts = {count for _, count in found}
+
+    if len(counts) != 1:
+        raise ValueError(f"Expected the shards of one build in "
+                         f"{shards_dir_path}, found {len(counts)}")
+
+    count = counts.pop()
+    missing = [shard_name((i, count)) for i in range(1, count + 1)
+               if (i, count) not in found or not path.isfile(
+                   path.join(found[i, count], SHARD_RECORD_NAME))]
+
+    if missing:
+        raise ValueError(f"Shards not built yet: {", ".join(missing)}")
+
+    return [found[i, count] for i in range(1, count + 1)]
+
+
+def write_shard_record(shard_dir_path: str, records: Dict[str, Dict]):
+    write_if_changed(path.join(shard_dir_path, SHARD_RECORD_NAME),
+                     json.dumps(records, indent=1, sort_keys=True))
+
+
+def read_shard_record(shard_dir_path: str) -> Dict[str, Dict]:
+    with open(path.join(shard_dir_path, SHARD_RECORD_NAME), 'r') as f:
+        return json.load(f)
+
+
+def relocate(file_path: str, from_dir_path: str, to_dir_path: str) -> str:
+    rel_path = path.relpath(file_path, from_dir_path)
+
+    if rel_path == ".." or rel_path.startswith(".." + path.sep):
+        return file_path
+
+    return path.join(to_dir_path, rel_path)
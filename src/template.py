@@ -0,0 +1,104 @@
+import re
+from io import StringIO
+from os import stat
+from typing import Dict, List, TextIO, Tuple
+
+from assets import rewrite_asset_urls
+from htmlnode import HTMLNode, escape_text
+from minify import MinifyingWriter, minify_html, minify_text
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)((?:\s+[\w-]+=[^\s{}]*)*)\s*\}\}")
+ARGUMENT = re.compile(r"([\w-]+)=([^\s{}]*)")
+
+
+class Markup(str):
+    pass
+
+
+class Template():
+    def __init__(self, source: str, minify: bool = False):
+        self.minify = minify
+        self.segments = compile_template(minify_html(source) if minify
+                                         else source)
+        self._linked: Tuple[Dict[str, str], List[Tuple[str, str]]] = (
+            None, self.segments)
+
+    def linked_segments(self, urls: Dict[str, str]) -> List[Tuple[str, str]]:
+        if not urls:
+            return self.segments
+
+        if self._linked[0] is not urls:
+            self._linked = (urls, [
+                (rewrite_asset_urls(text, urls) if name is None else text,
+                 name) for text, name in self.segments])
+
+        return self._linked[1]
+
+    def render_to(self, writer: TextIO, context: Dict,
+                  urls: Dict[str, str] = None):
+        for text, name in self.linked_segments(urls):
+            value = context.get(name) if name is not None else None
+
+            if callable(value):
+                value = value(placeholder_arguments(text))
+
+            if value is None:
+                writer.write(text)
+            elif isinstance(value, HTMLNode) and self.minify:
+                value.render_to(MinifyingWriter(writer))
+            elif isinstance(value, HTMLNode):
+                value.render_to(writer)
+            elif isinstance(value, Markup):
+                writer.write(value)
+            elif self.minify:
+                writer.write(minify_text(escape_text(str(value))))
+            else:
+                writer.write(escape_text(str(value)))
+
+    def render(self, context: Dict, urls: Dict[str, str] = None) -> str:
+        buffer = StringIO()
+        self.render_to(buffer, context, urls)
+
+        return buffer.getvalue()
+
+    def variables(self) -> List[str]:
+        return [name for _, name in self.segments if name is not None]
+
+
+def compile_template(source: str) -> List[Tuple[str, str]]:
+    segments = []
+    i = 0
+
+    for match in PLACEHOLDER.finditer(source):
+        if match.start() != i:
+            segments.append((source[i:match.start()], None))
+
+        segments.append((match.group(0), match.group(1)))
+        i = match.end()
+
+    if i != len(source):
+        segments.append((source[i:], None))
+
+    return segments
+
+
+def placeholder_arguments(placeholder: str) -> Dict[str, str]:
+    return dict(ARGUMENT.findall(placeholder))
+
+
+_templates: Dict[Tuple[str, bool], Tuple[int, Template]] = {}
+
+
+def load_template(template_path: str, minify: bool = False) -> Template:
+    mtime = stat(template_path).st_mtime_ns
+    cached = _templates.get((template_path, minify))
+
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(template_path, 'r') as f:
+        template = Template(f.read(), minify)
+
+    _templates[(template_path, minify)] = (mtime, template)
+
+    return template
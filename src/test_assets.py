@@ -0,0 +1,129 @@
+import unittest
+from os import makedirs, path, stat, utime
+from tempfile import TemporaryDirectory
+
+from assets import (collect_files, files_match, fingerprint_assets,
+                    fingerprint_name, place_file, rewrite_asset_urls,
+                    sync_files)
+from testutil import write
+
+
+def sync(source, destiny, link="copy"):
+    makedirs(destiny, exist_ok=True)
+
+    return sync_files(collect_files(source, destiny), link=link)
+
+
+def read(file_path):
+    with open(file_path, 'r') as f:
+        return f.read()
+
+
+class TestAssets(unittest.TestCase):
+    def test_place_file_modes(self):
+        with TemporaryDirectory() as tmp:
+            source = path.join(tmp, "static", "index.css")
+            write(source, "body {}")
+
+            for mode in ["copy", "hardlink", "reflink"]:
+                destiny = path.join(tmp, f"{mode}.css")
+                place_file(source, destiny, mode)
+
+                self.assertEqual("body {}", read(destiny))
+                self.assertTrue(files_match(source, destiny))
+
+    def test_files_match(self):
+        with TemporaryDirectory() as tmp:
+            source = path.join(tmp, "a.css")
+            destiny = path.join(tmp, "b.css")
+            write(source, "body {}")
+            self.assertFalse(files_match(source, destiny))
+
+            write(destiny, "body {}")
+            utime(destiny, ns=(0, 0))
+            self.assertFalse(files_match(source, destiny))
+            self.assertTrue(files_match(source, destiny, checksum=True))
+
+            write(destiny, "p {}")
+            self.assertFalse(files_match(source, destiny))
+
+    def test_sync_files_copies_only_changes(self):
+        with TemporaryDirectory() as tmp:
+            static = path.join(tmp, "static")
+            public = path.join(tmp, "public")
+            write(path.join(static, "index.css"), "body {}")
+            write(path.join(static, "images", "tom.png"), "png")
+
+            synced = sync(static, public)
+            self.assertEqual(2, sum(copied for _, _, copied in synced))
+
+            synced = sync(static, public)
+            self.assertEqual(0, sum(copied for _, _, copied in synced))
+
+            write(path.join(static, "index.css"), "body { margin: 0 }")
+            synced = sync(static, public)
+            self.assertEqual([path.join(public, "index.css")],
+                             [d for _, d, copied in synced if copied])
+            self.assertEqual("body { margin: 0 }",
+                             read(path.join(public, "index.css")))
+
+    def test_sync_files_hardlink(self):
+        with TemporaryDirectory() as tmp:
+            static = path.join(tmp, "static")
+            public = path.join(tmp, "public")
+            write(path.join(static, "index.css"), "body {}")
+
+            sync(static, public, link="hardlink")
+
+            self.assertEqual(stat(path.join(static, "index.css")).st_ino,
+                             stat(path.join(public, "index.css")).st_ino)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(path.join("images", "tom.0123456789.png"),
+                         fingerprint_name(path.join("images", "tom.png"),
+                                          "0123456789abcdef"))
+
+    def test_fingerprint_assets(self):
+        with TemporaryDirectory() as tmp:
+            static = path.join(tmp, "static")
+            public = path.join(tmp, "public")
+            write(path.join(static, "index.css"), "body {}")
+            write(path.join(static, "images", "tom.png"), "png")
+
+            sync(static, public)
+            assets = {url: (fingerprinted, d) for url, fingerprinted, d
+                      in fingerprint_assets(static, public)}
+
+            self.assertEqual({"/index.css", "/images/tom.png"}, set(assets))
+            fingerprinted, d = assets["/index.css"]
+            self.assertRegex(fingerprinted, r"^/index\.[0-9a-f]{10}\.css$")
+            self.assertEqual("body {}", read(d))
+
+            write(path.join(static, "index.css"), "body { margin: 0 }")
+            sync(static, public)
+            changed = {url: f for url, f, _
+                       in fingerprint_assets(static, public)}
+            self.assertNotEqual(fingerprinted, changed["/index.css"])
+
+    def test_rewrite_asset_urls(self):
+        assets = {"/index.css": "/index.abc.css",
+                  "/images/tom.png": "/images/tom.abc.png"}
+        html = ('<link href="/index.css"><img src="/images/tom.png" '
+                'alt="/index.css"><a href="/blog">blog</a>')
+
+        self.assertEqual('<link href="/index.abc.css">'
+                         '<img src="/images/tom.abc.png" alt="/index.css">'
+                         '<a href="/blog">blog</a>',
+                         rewrite_asset_urls(html, assets))
+
+    def test_rewrite_srcset(self):
+        assets = {"/tom.png": "/tom.abc.png"}
+        html = '<img srcset="/tom.0123-480w.png 480w, /tom.png 960w">'
+
+        self.assertEqual('<img srcset="/tom.0123-480w.png 480w, '
+                         '/tom.abc.png 960w">',
+                         rewrite_asset_urls(html, assets))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from buildprofile import PAGE_STAGES, BuildProfile
+
+
+def make_profile():
+    profile = BuildProfile()
+    profile.extend([("read", "a.md", 1.0, 0.5, 1),
+                    ("write", "a.md", 1.5, 0.25, 1),
+                    ("read", "b.md", 1.0, 0.125, 2),
+                    ("static copy", None, 0.0, 1.0, 1)])
+
+    return profile
+
+
+class TestBuildProfile(unittest.TestCase):
+    def test_stage(self):
+        profile = BuildProfile()
+
+        with profile.stage("read", "a.md"):
+            pass
+
+        self.assertEqual(1, len(profile.events))
+        self.assertEqual(("read", "a.md"), profile.events[0][:2])
+
+    def test_stage_records_on_error(self):
+        profile = BuildProfile()
+
+        with self.assertRaises(ValueError):
+            with profile.stage("inline parse", "a.md"):
+                raise ValueError()
+
+        self.assertEqual(1, len(profile.events))
+
+    def test_totals(self):
+        profile = make_profile()
+
+        self.assertEqual({"read": 0.625, "write": 0.25, "static copy": 1.0},
+                         profile.stage_totals())
+        self.assertEqual({"a.md": {"read": 0.5, "write": 0.25},
+                          "b.md": {"read": 0.125}},
+                         profile.page_stages())
+
+    def test_slowest_pages(self):
+        self.assertEqual([("a.md", 0.75)], make_profile().slowest_pages(1))
+
+    def test_summary_table(self):
+        table = make_profile().summary_table()
+
+        self.assertIn("static copy", table)
+        self.assertLess(table.index("read"), table.index("write"))
+        self.assertIn("read", PAGE_STAGES)
+
+    def test_chrome_trace(self):
+        trace = make_profile().chrome_trace()["traceEvents"]
+
+        self.assertEqual(4, len(trace))
+        self.assertEqual({"name": "read", "cat": "page", "ph": "X",
+                          "ts": 1e6, "dur": 0.5e6, "pid": 1, "tid": 1,
+                          "args": {"page": "a.md"}}, trace[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from tempfile import TemporaryDirectory
+
+from cache import ParseCache, parser_version
+from parser import markdown_to_html_node
+
+
+class CountingParser():
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, markdown):
+        self.calls += 1
+        return markdown_to_html_node(markdown)
+
+
+class TestParseCache(unittest.TestCase):
+    def test_memory_hit(self):
+        parse = CountingParser()
+        cache = ParseCache(parse=parse)
+
+        node = cache.parse("# Title\n\nSome **text**")
+
+        self.assertIs(node, cache.parse("# Title\n\nSome **text**"))
+        self.assertEqual(1, parse.calls)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_lru_eviction(self):
+        parse = CountingParser()
+        cache = ParseCache(max_entries=2, parse=parse)
+
+        cache.parse("# a")
+        cache.parse("# b")
+        cache.parse("# a")
+        cache.parse("# c")
+        cache.parse("# a")
+        self.assertEqual(3, parse.calls)
+
+        cache.parse("# b")
+        self.assertEqual(4, parse.calls)
+
+    def test_disk_layer(self):
+        with TemporaryDirectory() as tmp:
+            markdown = "# Title\n\n* one\n* *two*"
+            parse = CountingParser()
+
+            first = ParseCache(cache_dir=tmp, parse=parse).parse(markdown)
+            second = ParseCache(cache_dir=tmp, parse=parse).parse(markdown)
+
+            self.assertEqual(1, parse.calls)
+            self.assertEqual(first.to_html(), second.to_html())
+
+    def test_version_changes_key(self):
+        self.assertNotEqual(ParseCache(version="1").key("# a"),
+                            ParseCache(version="2").key("# a"))
+        self.assertEqual(parser_version(), ParseCache().version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import gzip
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+import compress
+from compress import (collect_compressible, compress_file, compress_files,
+                      is_compressible, variant_paths)
+from testutil import write
+
+
+class TestCompress(unittest.TestCase):
+    def test_is_compressible(self):
+        with TemporaryDirectory() as tmp:
+            html = path.join(tmp, "index.html")
+            png = path.join(tmp, "tom.png")
+            tiny = path.join(tmp, "tiny.css")
+            write(html, "<p>text</p>" * 100)
+            write(png, "png" * 1000)
+            write(tiny, "p {}")
+
+            self.assertTrue(is_compressible(html))
+            self.assertFalse(is_compressible(png))
+            self.assertFalse(is_compressible(tiny))
+            self.assertTrue(is_compressible(tiny, min_size=0))
+
+    def test_compress_file(self):
+        with TemporaryDirectory() as tmp:
+            html = path.join(tmp, "index.html")
+            write(html, "<p>text</p>" * 100)
+
+            written = compress_file(html)
+
+            self.assertEqual(variant_paths(html), written)
+            with gzip.open(f"{html}.gz", 'rt') as f:
+                self.assertEqual("<p>text</p>" * 100, f.read())
+
+    def test_compress_file_is_reproducible(self):
+        with TemporaryDirectory() as tmp:
+            html = path.join(tmp, "index.html")
+            write(html, "<p>text</p>" * 100)
+
+            compress_file(html)
+            with open(f"{html}.gz", 'rb') as f:
+                first = f.read()
+
+            compress_file(html)
+            with open(f"{html}.gz", 'rb') as f:
+                self.assertEqual(first, f.read())
+
+    def test_brotli_variant(self):
+        if compress.brotli is None:
+            self.skipTest("brotli is not installed")
+
+        with TemporaryDirectory() as tmp:
+            html = path.join(tmp, "index.html")
+            write(html, "<p>text</p>" * 100)
+
+            self.assertIn(f"{html}.br", compress_file(html))
+
+    def test_compress_files(self):
+        with TemporaryDirectory() as tmp:
+            pages = [path.join(tmp, "blog", f"post{i}", "index.html")
+                     for i in range(4)]
+
+            for page in pages:
+                write(page, f"<p>{page}</p>" * 50)
+
+            files = collect_compressible(tmp)
+            self.assertEqual(sorted(pages), files)
+
+            results = compress_files(files, jobs=2)
+            self.assertEqual(files, [f for f, _ in results])
+            self.assertTrue(all(path.exists(f"{page}.gz") for page in pages))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+from depgraph import (DependencyGraph, output_url, page_images, page_links,
+                      resolve_url)
+
+PUBLIC = path.join(".", "public")
+INDEX = path.join(PUBLIC, "index.html")
+POST = path.join(PUBLIC, "blog", "post", "index.html")
+ABOUT = path.join(PUBLIC, "about.html")
+
+
+def make_graph(graph_path):
+    graph = DependencyGraph(graph_path, PUBLIC)
+    graph.add(INDEX, "index.md", "template.html", links=["/blog/post"])
+    graph.add(POST, "post.md", "blog.html", ["assets.json"],
+              ["../../about.html#team", "https://example.com"])
+    graph.add(ABOUT, "about.md", "template.html", links=["/missing"])
+
+    return graph
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_page_links(self):
+        markdown = ("[a](/a) [b](https://b.org) ![img](/i.png) [c](#top) "
+                    "[d](../d) [again](/a)")
+        self.assertEqual(["../d", "/a"], page_links(markdown))
+        self.assertEqual(["/i.png"], page_images(
+            markdown + " ![ext](https://b.org/i.png) ![again](/i.png)"))
+
+    def test_urls(self):
+        self.assertEqual("/", output_url(INDEX, PUBLIC))
+        self.assertEqual("/blog/post", output_url(POST, PUBLIC))
+        self.assertEqual("/about.html", output_url(ABOUT, PUBLIC))
+        self.assertEqual("/blog/x", resolve_url("../x?q=1", "/blog/post"))
+        self.assertEqual("/", resolve_url("/#top", "/blog"))
+
+    def test_dependents(self):
+        with TemporaryDirectory() as tmp:
+            graph = make_graph(path.join(tmp, "graph.json"))
+
+            self.assertEqual([ABOUT, INDEX], graph.dependents("template.html"))
+            self.assertEqual([POST], graph.dependents("assets.json"))
+            self.assertEqual([POST, INDEX],
+                             graph.affected(["index.md", "blog.html"]))
+
+    def test_links(self):
+        with TemporaryDirectory() as tmp:
+            graph = make_graph(path.join(tmp, "graph.json"))
+
+            self.assertEqual([POST], graph.links_to(INDEX))
+            self.assertEqual([ABOUT], graph.links_to(POST))
+            self.assertEqual([], graph.links_to(ABOUT))
+            self.assertEqual([POST], graph.linked_from(ABOUT))
+            self.assertEqual({POST: [INDEX], ABOUT: [POST]},
+                             graph.reverse_links())
+
+    def test_persisted(self):
+        with TemporaryDirectory() as tmp:
+            graph_path = path.join(tmp, "cache", "graph.json")
+            make_graph(graph_path).save()
+
+            graph = DependencyGraph(graph_path, PUBLIC)
+            self.assertEqual(["post.md", "blog.html", "assets.json"],
+                             graph.dependencies(POST))
+
+            graph.retain([INDEX])
+            self.assertEqual([INDEX], list(graph.outputs))
+            self.assertEqual([INDEX], graph.dependents("index.md"))
+
+    def test_describe(self):
+        with TemporaryDirectory() as tmp:
+            graph = make_graph(path.join(tmp, "graph.json"))
+
+            self.assertEqual([POST,
+                              "  depends on post.md",
+                              "  depends on blog.html",
+                              "  depends on assets.json",
+                              f"  links to {ABOUT}",
+                              f"  linked from {INDEX}"],
+                             graph.describe("post.md"))
+            self.assertEqual(["blog.html", f"  used by {POST}"],
+                             graph.describe("blog.html"))
+            self.assertEqual([], graph.describe("other.md"))
+
+
+if __name__ == "__main__":
+    unittest.main()
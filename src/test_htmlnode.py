@@ -1,6 +1,8 @@
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text, set_url_map
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -17,6 +19,49 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(' prop1="value1" prop2="value2"',
                          node.props_to_html())
 
+    def test_escape(self):
+        self.assertEqual("a &lt;b&gt; &amp;amp; \"c\"",
+                         escape_text('a <b> &amp; "c"'))
+        self.assertEqual("&lt;&amp;&quot;'", escape_attribute('<&"\''))
+        plain = "nothing to escape"
+        self.assertIs(plain, escape_text(plain))
+
+    def test_props_are_escaped_once(self):
+        props = {"href": "/?a=1&b=2", "title": '"quoted"'}
+        node = LeafNode("a", "x", props)
+
+        self.assertEqual('<a href="/?a=1&amp;b=2" title="&quot;quoted&quot;">',
+                         node.start_tag())
+        self.assertIs(node.start_tag(), node.start_tag())
+        self.assertIs(LeafNode("p", "x").start_tag(),
+                      LeafNode("p", "y").start_tag())
+
+    def test_url_attributes_are_rewritten(self):
+        set_url_map({"/tom.png": "/tom.abc.png", "/a": "/a.abc"})
+
+        try:
+            image = LeafNode("img", "", {
+                "src": "/tom.png", "alt": "/tom.png",
+                "srcset": "/tom.0123-480w.png 480w, /tom.png 960w"})
+            link = LeafNode("a", 'src="/tom.png"', {"href": "/a"})
+
+            self.assertEqual('<img src="/tom.abc.png" alt="/tom.png" '
+                             'srcset="/tom.0123-480w.png 480w, '
+                             '/tom.abc.png 960w"></img>', image.to_html())
+            self.assertEqual('<a href="/a.abc">src="/tom.png"</a>',
+                             link.to_html())
+        finally:
+            set_url_map({})
+
+    def test_to_html_not_implemented(self):
+        node = HTMLNode()
+        self.assertRaises(NotImplementedError, node.to_html)
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in [HTMLNode(), LeafNode("b", "text"),
+                     ParentNode("p", [LeafNode(None, "text")])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
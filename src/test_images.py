@@ -0,0 +1,108 @@
+import struct
+import unittest
+import zlib
+from os import listdir, makedirs, path
+from tempfile import TemporaryDirectory
+
+import images
+from images import (ImageCache, image_attributes, image_size, is_image,
+                    process_images, variant_name)
+
+
+def write_bytes(file_path, data):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+
+def png(width, height):
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data +
+                struct.pack(">I", zlib.crc32(kind + data)))
+
+    rows = b"".join(b"\x00" + b"\x80" * width * 3 for _ in range(height))
+
+    return (b"\x89PNG\r\n\x1a\n" +
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0,
+                                       0, 0)) +
+            chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def jpeg_header(width, height):
+    return (b"\xff\xd8" + b"\xff\xe0" + struct.pack(">H", 16) + b"\x00" * 14 +
+            b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width))
+
+
+class TestImages(unittest.TestCase):
+    def test_image_size(self):
+        with TemporaryDirectory() as tmp:
+            files = {"a.png": png(3, 2),
+                     "b.gif": b"GIF89a" + struct.pack("<HH", 7, 5),
+                     "c.jpg": jpeg_header(640, 480),
+                     "d.jpg": b"\xff\xd8\x00"}
+
+            for name, data in files.items():
+                write_bytes(path.join(tmp, name), data)
+
+            self.assertEqual((3, 2), image_size(path.join(tmp, "a.png")))
+            self.assertEqual((7, 5), image_size(path.join(tmp, "b.gif")))
+            self.assertEqual((640, 480), image_size(path.join(tmp, "c.jpg")))
+            self.assertIsNone(image_size(path.join(tmp, "d.jpg")))
+
+    def test_names_and_attributes(self):
+        self.assertTrue(is_image("a/B.JPG"))
+        self.assertFalse(is_image("a/b.css"))
+        self.assertEqual(path.join("images", "tom.0123456789-480w.png"),
+                         variant_name(path.join("images", "tom.png"),
+                                      "0123456789abcdef", 480))
+        self.assertEqual({"width": "800", "height": "600",
+                          "loading": "lazy"},
+                         image_attributes(800, 600, []))
+        self.assertEqual("/a-480w.png 480w, /a.png 800w", image_attributes(
+            800, 600, [("/a-480w.png", 480), ("/a.png", 800)])["srcset"])
+
+    def test_sizes_cached_by_hash(self):
+        with TemporaryDirectory() as tmp:
+            static = path.join(tmp, "static")
+            public = path.join(tmp, "public")
+            write_bytes(path.join(static, "images", "a.png"), png(3, 2))
+            write_bytes(path.join(static, "index.css"), b"p {}")
+
+            cache = ImageCache(path.join(tmp, "cache"))
+            attributes, _ = process_images(static, public, cache,
+                                           hash_func=lambda _: "abc")
+            self.assertEqual({"/images/a.png": image_attributes(3, 2, [])},
+                             attributes)
+
+            cache = ImageCache(path.join(tmp, "cache"))
+            cache.sizes["abc"] = [30, 20]
+            attributes, _ = process_images(static, public, cache,
+                                           hash_func=lambda _: "abc")
+            self.assertEqual("30", attributes["/images/a.png"]["width"])
+
+    def test_resized_variants(self):
+        if images.Image is None:
+            self.skipTest("Pillow is not installed")
+
+        with TemporaryDirectory() as tmp:
+            static = path.join(tmp, "static")
+            public = path.join(tmp, "public")
+            write_bytes(path.join(static, "images", "a.png"), png(40, 20))
+            cache = ImageCache(path.join(tmp, "cache"))
+
+            attributes, published = process_images(
+                static, public, cache, [10, 20, 40], 2, lambda _: "f" * 64)
+
+            self.assertEqual(["a.ffffffffff-10w.png",
+                              "a.ffffffffff-20w.png"],
+                             sorted(listdir(path.join(public, "images"))))
+            self.assertEqual(2, len(published))
+            self.assertEqual((10, 5), image_size(published[0]))
+            self.assertEqual("/images/a.ffffffffff-10w.png 10w, "
+                             "/images/a.ffffffffff-20w.png 20w, "
+                             "/images/a.png 40w",
+                             attributes["/images/a.png"]["srcset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
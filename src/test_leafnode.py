@@ -21,6 +21,16 @@ class TestLeafNode(unittest.TestCase):
         self.assertEqual('<b prop="value">text</b>',
                          node.to_html())
 
+    def test_value_is_escaped(self):
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual("<code>if a &lt; b &amp;&amp; c &gt; d:</code>",
+                         node.to_html())
+        fragments = []
+        node.write_html(fragments.append)
+        self.assertEqual(["<code>", "if a &lt; b &amp;&amp; c &gt; d:",
+                          "</code>"], fragments)
+        self.assertEqual("&lt; Back", LeafNode(None, "< Back").to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+from linkcheck import LinkIndex, canonical_url
+from testutil import write
+
+PUBLIC = path.join(".", "public")
+INDEX = path.join(PUBLIC, "index.html")
+POST = path.join(PUBLIC, "blog", "post", "index.html")
+ABOUT = path.join(PUBLIC, "about.html")
+DRAFT = path.join(PUBLIC, "blog", "draft", "index.html")
+
+
+class TestLinkCheck(unittest.TestCase):
+    def test_canonical_url(self):
+        self.assertEqual("/", canonical_url("/index.html"))
+        self.assertEqual("/", canonical_url("/"))
+        self.assertEqual("/blog/post", canonical_url("/blog/post/index.html"))
+        self.assertEqual("/blog", canonical_url("/blog/"))
+
+    def test_check(self):
+        index = LinkIndex(PUBLIC)
+        index.add_page(INDEX, ["/blog/post/", "/about", "/gone"],
+                       ["/images/a.png"])
+        index.add_page(POST, ["../../index.html#top", "/files/doc.pdf",
+                              "/blog/", "/blog/post"], ["missing.png"])
+        index.add_page(ABOUT, [], [])
+        index.add_page(DRAFT, ["/"], [])
+        index.files.update(["/images/a.png", "/files/doc.pdf",
+                            "/blog/index.html"])
+
+        report = index.check()
+
+        self.assertEqual([(INDEX, "/gone")], report.dangling)
+        self.assertEqual([(POST, "missing.png")], report.broken_images)
+        self.assertEqual([DRAFT], report.orphans)
+        self.assertFalse(report.ok())
+        self.assertEqual("Checked 10 references: 1 dangling links, "
+                         "1 broken images, 1 orphaned pages",
+                         report.lines()[-1])
+
+        index.mark_linked([DRAFT])
+        self.assertEqual([], index.check().orphans)
+
+    def test_self_links_do_not_count(self):
+        index = LinkIndex(PUBLIC)
+        index.add_page(INDEX, [], [])
+        index.add_page(ABOUT, ["/about.html"], [])
+
+        self.assertEqual([ABOUT], index.check().orphans)
+
+    def test_add_files(self):
+        with TemporaryDirectory() as tmp:
+            write(path.join(tmp, "index.html"))
+            write(path.join(tmp, "images", "a.png"))
+            index = LinkIndex(tmp)
+            index.add_files()
+
+            self.assertEqual({"/index.html", "/images/a.png"}, index.files)
+
+    def test_add_outputs(self):
+        index = LinkIndex(PUBLIC)
+        index.add_outputs([INDEX, POST, path.join(".", "cache", "x.json")])
+
+        self.assertEqual({"/index.html", "/blog/post/index.html"},
+                         index.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
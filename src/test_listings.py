@@ -0,0 +1,96 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from xml.dom.minidom import parse
+
+from listings import (PageIndex, collect_sections, listing_node,
+                      listing_path, listing_url, paginate, summarize,
+                      write_atom, write_rss, write_sitemap)
+
+PUBLIC = path.join(".", "public")
+
+
+def page(url, title, updated=0.0, summary=""):
+    return {"url": url, "title": title, "summary": summary,
+            "updated": updated}
+
+
+class TestListings(unittest.TestCase):
+    def test_summarize(self):
+        self.assertEqual("a b c", summarize(" a\nb   c "))
+        self.assertEqual("one two…", summarize("one two three", 10))
+
+    def test_collect_sections(self):
+        outputs = [path.join(PUBLIC, "index.html"),
+                   path.join(PUBLIC, "about", "index.html"),
+                   path.join(PUBLIC, "blog", "a", "index.html"),
+                   path.join(PUBLIC, "blog", "b.html"),
+                   path.join(PUBLIC, "docs", "index.html"),
+                   path.join(PUBLIC, "docs", "intro", "index.html")]
+
+        self.assertEqual({path.join(PUBLIC, "blog"): outputs[2:4]},
+                         collect_sections(outputs, PUBLIC))
+
+    def test_paginate(self):
+        self.assertEqual([[1, 2], [3, 4], [5]], paginate([1, 2, 3, 4, 5], 2))
+        self.assertEqual([[]], paginate([], 2))
+        self.assertEqual([[1, 2]], paginate([1, 2], 0))
+        self.assertEqual("/blog/", listing_url("/blog", 1))
+        self.assertEqual("/blog/page/3/", listing_url("/blog", 3))
+        self.assertEqual("/", listing_url("/", 1))
+        self.assertEqual(path.join("blog", "page", "2", "index.html"),
+                         listing_path("blog", 2))
+
+    def test_listing_node(self):
+        node = listing_node([page("/blog/a", "A", summary="About a")],
+                            "/blog", 2, 3)
+
+        self.assertEqual('<div><ul><li><h2><a href="/blog/a">A</a></h2>'
+                         '<p>About a</p></li></ul><nav>'
+                         '<a href="/blog/" rel="prev">Newer</a>'
+                         '<a href="/blog/page/3/" rel="next">Older</a>'
+                         '</nav></div>', node.to_html())
+
+    def test_feeds_are_well_formed(self):
+        posts = [page("/blog/a", 'A & "B"', 86400.0, "<summary>"),
+                 page("/blog/b", "C", 0.0)]
+
+        with TemporaryDirectory() as tmp:
+            rss = path.join(tmp, "rss.xml")
+            atom = path.join(tmp, "atom.xml")
+            sitemap = path.join(tmp, "sitemap.xml")
+            write_rss(rss, "https://x.org", "Blog", "/blog/", iter(posts))
+            write_atom(atom, "https://x.org", "Blog", "/blog/", iter(posts),
+                       86400.0)
+            write_sitemap(sitemap, "https://x.org",
+                          iter([("/blog/a", 86400.0), ("/", 0.0)]))
+
+            items = parse(rss).getElementsByTagName("item")
+            self.assertEqual(2, len(items))
+            self.assertEqual('A & "B"', items[0].getElementsByTagName(
+                "title")[0].firstChild.data)
+
+            entries = parse(atom).getElementsByTagName("entry")
+            self.assertEqual("1970-01-02T00:00:00+00:00",
+                             entries[0].getElementsByTagName(
+                                 "updated")[0].firstChild.data)
+
+            urls = parse(sitemap).getElementsByTagName("loc")
+            self.assertEqual(["https://x.org/blog/a", "https://x.org/"],
+                             [u.firstChild.data for u in urls])
+
+    def test_page_index(self):
+        with TemporaryDirectory() as tmp:
+            index_path = path.join(tmp, "cache", "pages.json")
+            index = PageIndex(index_path)
+            index.update("a.html", page("/a", "A"))
+            index.update("b.html", page("/b", "B"))
+            index.save()
+
+            index = PageIndex(index_path)
+            index.retain(["b.html"])
+            self.assertEqual({"b.html": page("/b", "B")}, index.pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
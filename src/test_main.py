@@ -0,0 +1,358 @@
+import unittest
+from os import chdir, getcwd, makedirs, path, remove, stat, walk
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+
+from buildprofile import BuildProfile
+from compress import variant_paths
+from depgraph import DependencyGraph
+from listings import PageIndex
+from main import (BuildOptions, collect_pages, copy_static_content,
+                  generate_pages_recursive, set_search_terms,
+                  set_stream_threshold)
+from metadata import MetadataIndex
+from parser import extract_title
+from search import SearchIndex
+from testutil import write
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+def read_tree(root):
+    files = {}
+
+    for dir_path, _, names in walk(root):
+        for name in names:
+            file_path = path.join(dir_path, name)
+            with open(file_path, 'rb') as f:
+                files[path.relpath(file_path, root)] = f.read()
+
+    return files
+
+
+def make_site(root):
+    write(path.join(root, "template.html"), TEMPLATE)
+    write(path.join(root, "content", "index.md"),
+          "# Home\n\nSome **bold** and [a link](/blog/post)")
+
+    for i in range(6):
+        write(path.join(root, "content", "blog", f"post{i}", "index.md"),
+              f"# Post {i}\n\n* item *{i}*\n* `code`\n\n> quote {i}")
+
+
+def build_site(root, **options):
+    cwd = getcwd()
+    chdir(root)
+
+    try:
+        return copy_static_content(BuildOptions(**options))
+    finally:
+        chdir(cwd)
+        set_search_terms(False)
+
+
+class TestMain(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual("Home", extract_title("# Home \n\n# Other"))
+        self.assertEqual("Home", extract_title("# Home"))
+
+        for markdown in ["", "# \ntext", "text\n# Title", "## Title"]:
+            with self.assertRaises(ValueError):
+                extract_title(markdown)
+
+    def test_collect_pages(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            public = path.join(tmp, "public")
+
+            template = path.join(tmp, "template.html")
+            pages = collect_pages(content, public, template)
+
+            self.assertEqual(7, len(pages))
+            self.assertIn((path.join(content, "index.md"),
+                           path.join(public, "index.html"),
+                           template), pages)
+
+    def test_section_template(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            public = path.join(tmp, "public")
+            section_template = path.join(content, "blog", "template.html")
+            write(section_template, "<article>{{ Content }}</article>")
+
+            generate_pages_recursive(content, path.join(tmp, "template.html"),
+                                     public)
+
+            files = read_tree(public)
+            self.assertNotIn(path.join("blog", "template.html"), files)
+            self.assertTrue(files[path.join("blog", "post0", "index.html")]
+                            .startswith(b"<article><div><h1>"))
+            self.assertTrue(files["index.html"].startswith(b"<title>Home"))
+
+    def test_parallel_build_matches_serial(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            serial = path.join(tmp, "serial")
+            parallel = path.join(tmp, "parallel")
+
+            generate_pages_recursive(content, template, serial)
+            generate_pages_recursive(content, template, parallel, jobs=3)
+
+            self.assertEqual(read_tree(serial), read_tree(parallel))
+
+    def test_pipelined_build_matches_serial(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            serial = path.join(tmp, "serial")
+            pipelined = path.join(tmp, "pipelined")
+            serial_graph = DependencyGraph(path.join(tmp, "s.json"), serial)
+            graph = DependencyGraph(path.join(tmp, "p.json"), pipelined)
+
+            generate_pages_recursive(content, template, serial,
+                                     graph=serial_graph)
+            profile = BuildProfile()
+            generate_pages_recursive(content, template, pipelined,
+                                     graph=graph, io_threads=3,
+                                     profile=profile)
+
+            self.assertEqual(read_tree(serial), read_tree(pipelined))
+            self.assertEqual({"read", "render", "write"}, set(
+                profile.page_stages()[path.join(content, "index.md")]))
+            self.assertEqual(
+                [e["links"] for e in serial_graph.outputs.values()],
+                [e["links"] for e in graph.outputs.values()])
+
+    def test_profiled_build_matches_plain(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            plain = path.join(tmp, "plain")
+            profiled = path.join(tmp, "profiled")
+            profile = BuildProfile()
+
+            generate_pages_recursive(content, template, plain)
+            generate_pages_recursive(content, template, profiled,
+                                     profile=profile)
+
+            self.assertEqual(read_tree(plain), read_tree(profiled))
+            self.assertEqual(7, len(profile.page_stages()))
+
+            write(path.join(content, "new", "index.md"), "# New\n\ntext")
+            profile = BuildProfile()
+            generate_pages_recursive(content, template, profiled,
+                                     profile=profile)
+            self.assertEqual(["read", "block split", "block typing",
+                              "inline parse", "render"],
+                             list(profile.page_stages()[
+                                 path.join(content, "new", "index.md")]))
+
+    def test_streamed_build_matches_plain(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            plain = path.join(tmp, "plain")
+            streamed = path.join(tmp, "streamed")
+            graph = DependencyGraph(path.join(tmp, "graph.json"), streamed)
+            write(path.join(content, "code", "index.md"),
+                  "# Code\n\n```\nx = 1\n\n\ny = [2](/z)\n```\n\n[home](/)")
+
+            generate_pages_recursive(content, template, plain)
+            set_stream_threshold(0)
+
+            try:
+                generate_pages_recursive(content, template, streamed,
+                                         graph=graph)
+            finally:
+                set_stream_threshold(8 << 20)
+
+            self.assertEqual(read_tree(plain), read_tree(streamed))
+            self.assertEqual(["/", "/z"], graph.outputs[
+                path.join(streamed, "code", "index.html")]["links"])
+
+    def test_search_terms_recorded_while_rendering(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            index = SearchIndex(path.join(tmp, "search.json"), "v1")
+            set_search_terms(True)
+
+            try:
+                generate_pages_recursive(content, template,
+                                         path.join(tmp, "public"), jobs=3,
+                                         search_index=index)
+            finally:
+                set_search_terms(False)
+
+            page = index.pages[path.join(content, "blog", "post2",
+                                         "index.md")]
+            self.assertEqual("/blog/post2", page["url"])
+            self.assertEqual({"post": 1, "item": 1, "code": 1, "quote": 1},
+                             page["terms"])
+            self.assertEqual(7, len(index.pages))
+
+    def test_front_matter_query(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            write(path.join(content, "blog", "template.html"),
+                  "<p>{{ date }}</p>{{ Content }}"
+                  "{{ Pages tags=news sort=-date limit=2 }}")
+
+            for i, date in enumerate(["2024-01-01", "2024-03-01",
+                                      "2024-02-01"]):
+                write(path.join(content, "blog", f"post{i}", "index.md"),
+                      f"---\ntitle: News {i}\ndate: {date}\ntags: [news]\n"
+                      f"---\n# Post {i}\n\ntext")
+
+            serial = path.join(tmp, "serial")
+            parallel = path.join(tmp, "parallel")
+
+            for public, jobs in [(serial, 1), (parallel, 3)]:
+                metadata = MetadataIndex(public + ".json",
+                                         public + "-table.json")
+                generate_pages_recursive(content, template, public,
+                                         jobs=jobs, metadata=metadata)
+
+            files = read_tree(serial)
+            self.assertEqual(files, read_tree(parallel))
+            self.assertEqual(b'<p>2024-03-01</p><div><h1>Post 1</h1>'
+                             b'<p>text</p></div><ul>'
+                             b'<li><a href="/blog/post1">News 1</a></li>'
+                             b'<li><a href="/blog/post2">News 2</a></li>'
+                             b'</ul>',
+                             files[path.join("blog", "post1", "index.html")])
+
+    def test_shards_cover_serial_build(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            serial = path.join(tmp, "serial")
+            sharded = path.join(tmp, "sharded")
+
+            expected = generate_pages_recursive(content, template, serial)
+            rendered = []
+
+            for i in range(1, 4):
+                rendered.extend(generate_pages_recursive(
+                    content, template, sharded, shard=(i, 3)))
+
+            self.assertEqual(sorted(s for s, _, _ in expected),
+                             sorted(s for s, _, _ in rendered))
+            self.assertEqual(read_tree(serial), read_tree(sharded))
+
+    def test_incremental_link_check_ignores_stale_outputs(self):
+        with TemporaryDirectory() as tmp:
+            write(path.join(tmp, "template.html"), TEMPLATE)
+            write(path.join(tmp, "content", "index.md"),
+                  "# Home\n\nRead [about](/about)")
+            write(path.join(tmp, "content", "about", "index.md"), "# About")
+            makedirs(path.join(tmp, "static"))
+
+            self.assertTrue(build_site(tmp, incremental=True,
+                                       check_links=True).ok())
+
+            remove(path.join(tmp, "content", "about", "index.md"))
+            report = build_site(tmp, incremental=True, check_links=True)
+
+            self.assertEqual([(path.join(".", "public", "index.html"),
+                               "/about")], report.dangling)
+            self.assertFalse(path.exists(
+                path.join(tmp, "public", "about", "index.html")))
+
+    def test_incremental_build_removes_stale_variants(self):
+        with TemporaryDirectory() as tmp:
+            write(path.join(tmp, "template.html"), TEMPLATE)
+            write(path.join(tmp, "content", "index.md"), "# Home")
+            write(path.join(tmp, "content", "about", "index.md"),
+                  "# About\n\n" + "Some words about the site. " * 20)
+            makedirs(path.join(tmp, "static"))
+            about = path.join(tmp, "public", "about", "index.html")
+
+            build_site(tmp, incremental=True, compress=True)
+
+            for v in variant_paths(about):
+                self.assertTrue(path.exists(v))
+
+            remove(path.join(tmp, "content", "about", "index.md"))
+            build_site(tmp, incremental=True, compress=True)
+
+            for v in [about, *variant_paths(about)]:
+                self.assertFalse(path.exists(v))
+
+    def test_incremental_search_index_matches_clean_build(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            makedirs(path.join(tmp, "static"))
+            search = path.join(tmp, "public", "search")
+            build_site(tmp, incremental=True, search=True)
+
+            post = path.join(tmp, "content", "blog", "post2")
+            remove(path.join(post, "index.md"))
+            write(path.join(post, "moved.md"), "# Moved\n\nNew *words*")
+            build_site(tmp, incremental=True, search=True)
+            incremental = read_tree(search)
+
+            rmtree(path.join(tmp, ".cache"))
+            rmtree(path.join(tmp, "public"))
+            build_site(tmp, search=True)
+
+            self.assertEqual(read_tree(search), incremental)
+
+    def test_page_dates_from_front_matter(self):
+        with TemporaryDirectory() as tmp:
+            content = path.join(tmp, "content")
+            write(path.join(tmp, "template.html"), TEMPLATE)
+            write(path.join(content, "dated.md"),
+                  "---\ndate: 2024-05-01\n---\n# Dated")
+            write(path.join(content, "undated.md"), "# Undated")
+            page_index = PageIndex(path.join(tmp, "pages.json"))
+            public = path.join(tmp, "public")
+            makedirs(public)
+
+            generate_pages_recursive(content, path.join(tmp, "template.html"),
+                                     public, page_index=page_index)
+
+            self.assertEqual(
+                1714521600.0,
+                page_index.pages[path.join(public, "dated.html")]["updated"])
+            self.assertEqual(
+                stat(path.join(content, "undated.md")).st_mtime,
+                page_index.pages[path.join(public, "undated.html")]["updated"])
+
+    def test_dependency_graph(self):
+        with TemporaryDirectory() as tmp:
+            make_site(tmp)
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            public = path.join(tmp, "public")
+            index = path.join(public, "index.html")
+            post = path.join(public, "blog", "post", "index.html")
+            graph = DependencyGraph(path.join(tmp, "graph.json"), public)
+
+            write(path.join(content, "blog", "post", "index.md"),
+                  "# Post\n\n[home](/) and [first](../post0)")
+            generate_pages_recursive(content, template, public, jobs=3,
+                                     graph=graph)
+
+            self.assertEqual(8, len(graph.dependents(template)))
+            self.assertEqual([path.join(content, "index.md"), template],
+                             graph.dependencies(index))
+            self.assertEqual([path.join(public, "blog", "post0",
+                                        "index.html"), index],
+                             graph.links_to(post))
+            self.assertEqual([post], graph.linked_from(index))
+
+
+if __name__ == "__main__":
+    unittest.main()
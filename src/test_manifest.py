@@ -0,0 +1,79 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+
+from manifest import Manifest, code_version, hash_file
+from testutil import write
+
+
+class TestManifest(unittest.TestCase):
+    def test_hash_file(self):
+        with TemporaryDirectory() as tmp:
+            a = path.join(tmp, "a.md")
+            b = path.join(tmp, "b.md")
+            write(a, "# title")
+            write(b, "# title")
+            self.assertEqual(hash_file(a), hash_file(b))
+
+            write(b, "# other")
+            self.assertNotEqual(hash_file(a), hash_file(b))
+
+    def test_code_version_is_stable(self):
+        self.assertEqual(code_version(), code_version())
+
+    def test_fresh_after_save(self):
+        with TemporaryDirectory() as tmp:
+            src = path.join(tmp, "index.md")
+            out = path.join(tmp, "public", "index.html")
+            manifest_path = path.join(tmp, "manifest.json")
+            write(src, "# title")
+            write(out, "<h1>title</h1>")
+
+            manifest = Manifest(manifest_path, "v1")
+            self.assertFalse(manifest.is_fresh(out, [src]))
+            manifest.record(out, [src])
+            manifest.save()
+
+            manifest = Manifest(manifest_path, "v1")
+            self.assertTrue(manifest.is_fresh(out, [src]))
+
+            write(src, "# changed")
+            manifest = Manifest(manifest_path, "v1")
+            self.assertFalse(manifest.is_fresh(out, [src]))
+
+    def test_version_change_invalidates(self):
+        with TemporaryDirectory() as tmp:
+            src = path.join(tmp, "index.md")
+            out = path.join(tmp, "index.html")
+            manifest_path = path.join(tmp, "manifest.json")
+            write(src, "# title")
+            write(out, "<h1>title</h1>")
+
+            manifest = Manifest(manifest_path, "v1")
+            manifest.record(out, [src])
+            manifest.save()
+
+            manifest = Manifest(manifest_path, "v2")
+            self.assertFalse(manifest.is_fresh(out, [src]))
+
+    def test_remove_stale(self):
+        with TemporaryDirectory() as tmp:
+            src = path.join(tmp, "index.md")
+            root = path.join(tmp, "public")
+            out = path.join(root, "blog", "post", "index.html")
+            manifest_path = path.join(tmp, "manifest.json")
+            write(src, "# title")
+            write(out, "<h1>title</h1>")
+
+            manifest = Manifest(manifest_path, "v1")
+            manifest.record(out, [src])
+            manifest.save()
+
+            manifest = Manifest(manifest_path, "v1")
+            self.assertEqual([out], manifest.remove_stale(root))
+            self.assertFalse(path.exists(path.join(root, "blog")))
+            self.assertTrue(path.exists(root))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from io import StringIO
+from os import path, utime
+from tempfile import TemporaryDirectory
+
+from metadata import (MetadataIndex, is_in_section, page_date, page_title,
+                      pages_node, parse_front_matter, query,
+                      read_front_matter, split_front_matter)
+from testutil import write
+
+FRONT_MATTER = """---
+title: "The Fellowship: Part 1"
+date: 2024-05-01
+# drafts are listed too
+tags: [tolkien, 'books']
+authors:
+  - Frodo
+  - Sam
+---
+# Heading
+
+Body
+"""
+
+
+class TestMetadata(unittest.TestCase):
+    def test_parse_front_matter(self):
+        self.assertEqual({"title": "The Fellowship: Part 1",
+                          "date": "2024-05-01",
+                          "tags": ["tolkien", "books"],
+                          "authors": ["Frodo", "Sam"]},
+                         split_front_matter(FRONT_MATTER)[0])
+
+        with self.assertRaises(ValueError):
+            parse_front_matter(["no separator"])
+
+    def test_split_front_matter(self):
+        self.assertEqual("# Heading\n\nBody\n",
+                         split_front_matter(FRONT_MATTER)[1])
+        self.assertEqual(({}, "# Home\n---\n"),
+                         split_front_matter("# Home\n---\n"))
+        self.assertEqual(({"a": "b"}, ""),
+                         split_front_matter("---\na: b\n---"))
+        self.assertEqual(({"a": "b"}, "# Title\n\ntext"),
+                         split_front_matter("---\na: b\n---\n\n \n"
+                                            "# Title\n\ntext"))
+
+        with self.assertRaises(ValueError):
+            split_front_matter("---\na: b\n")
+
+    def test_read_front_matter_stops_after_header(self):
+        f = StringIO(FRONT_MATTER)
+        meta, first_line = read_front_matter(f)
+
+        self.assertEqual(["Frodo", "Sam"], meta["authors"])
+        self.assertEqual("# Heading\n", first_line)
+        self.assertEqual("\n", f.readline())
+        self.assertEqual(({}, "# Home\n"), read_front_matter(
+            StringIO("# Home\n\ntext")))
+
+    def test_title_after_blank_lines(self):
+        markdown = "---\ndate: 2024-05-01\n---\n\n# Title\n\ntext\n"
+
+        self.assertEqual("Title",
+                         page_title(*read_front_matter(StringIO(markdown))))
+        self.assertEqual("Title", page_title(*split_front_matter(markdown)))
+        self.assertEqual(({"a": "b"}, ""),
+                         read_front_matter(StringIO("---\na: b\n---\n\n")))
+
+    def test_page_title(self):
+        self.assertEqual("Meta", page_title({"title": "Meta"}, "# H1"))
+        self.assertEqual("H1", page_title({"tags": []}, "# H1\n"))
+
+        with self.assertRaises(ValueError):
+            page_title({}, "text")
+
+    def test_page_date(self):
+        self.assertEqual(1714521600.0, page_date({"date": "2024-05-01"}))
+        self.assertEqual(1714557600.0,
+                         page_date({"date": "2024-05-01T12:00:00+02:00"}))
+        self.assertIsNone(page_date({"title": "No date"}))
+
+        with self.assertRaises(ValueError):
+            page_date({"date": "May 1st"})
+
+    def test_query(self):
+        pages = {
+            "a.md": {"url": "/blog/a", "title": "A",
+                     "meta": {"date": "2024-01-02", "tags": ["x"]}},
+            "b.md": {"url": "/blog/b", "title": "B",
+                     "meta": {"date": "2024-03-04", "tags": ["x", "y"]}},
+            "c.md": {"url": "/about", "title": "C",
+                     "meta": {"date": "2024-02-03", "draft": "true"}}}
+
+        def urls(arguments):
+            return [e["url"] for e in query(pages, arguments)]
+
+        self.assertEqual(["/blog/a", "/blog/b", "/about"], urls({}))
+        self.assertEqual(["/blog/b", "/about"],
+                         urls({"sort": "-date", "limit": "2"}))
+        self.assertEqual(["/blog/b"], urls({"tags": "y"}))
+        self.assertEqual(["/about"], urls({"draft": "true"}))
+        self.assertEqual(["/blog/a", "/blog/b"], urls({"section": "/blog/"}))
+        self.assertFalse(is_in_section("/blogroll", "/blog"))
+        self.assertEqual('<ul><li><a href="/blog/b">B</a></li></ul>',
+                         pages_node(query(pages, {"tags": "y"})).to_html())
+        self.assertEqual("", pages_node([]))
+
+    def test_index_refresh(self):
+        with TemporaryDirectory() as tmp:
+            index_path = path.join(tmp, "cache", "metadata.json")
+            table_path = path.join(tmp, "cache", "table.json")
+            a = path.join(tmp, "a.md")
+            b = path.join(tmp, "b.md")
+            write(a, FRONT_MATTER)
+            write(b, "# B\n")
+
+            index = MetadataIndex(index_path, table_path)
+            self.assertEqual([a, b], index.refresh([(a, "/a"), (b, "/b")]))
+            self.assertTrue(index.write_table())
+            self.assertFalse(index.write_table())
+            index.save()
+
+            index = MetadataIndex(index_path, table_path)
+            self.assertEqual("The Fellowship: Part 1", index.pages[a]["title"])
+            self.assertEqual([], index.refresh([(a, "/a"), (b, "/b")]))
+
+            write(b, "---\ntags: [x]\n---\n# B\n")
+            utime(b, ns=(0, 0))
+            self.assertEqual([a, b], index.refresh([(b, "/b")]))
+            self.assertEqual({b: {"url": "/b", "title": "B",
+                                  "meta": {"tags": ["x"]}}}, index.pages)
+            self.assertTrue(index.write_table())
+
+
+if __name__ == "__main__":
+    unittest.main()
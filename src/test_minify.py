@@ -0,0 +1,58 @@
+import unittest
+from io import StringIO
+
+from minify import MinifyingWriter, minify_css, minify_html, minify_text
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_html(self):
+        html = ("<html>\n  <head>\n    <title> Title </title>\n  </head>\n"
+                "  <body>\n    <p>some   text\n  here</p> <b>x</b>\n"
+                "    <pre><code>keep\n   this</code></pre>\n  </body>\n"
+                "</html>\n")
+
+        self.assertEqual("<html><head><title> Title </title></head><body>"
+                         "<p>some text here</p> <b>x</b> <pre><code>keep\n"
+                         "   this</code></pre></body></html> ",
+                         minify_html(html))
+
+    def test_minify_html_keeps_space_between_inline_tags(self):
+        self.assertEqual("<p><b>Tom</b> <i>Jerry</i></p>",
+                         minify_html("<p><b>Tom</b>\n<i>Jerry</i></p>"))
+        self.assertEqual("<ul><li><a href=\"/\">a</a></li><li>b</li></ul>",
+                         minify_html("<ul>\n  <li><a href=\"/\">a</a></li>"
+                                     "\n  <li>b</li>\n</ul>"))
+        self.assertEqual("<!DOCTYPE html><html><span>x</span> </html>",
+                         minify_html("<!DOCTYPE html>\n<html>"
+                                     "<span>x</span>\n</html>"))
+
+    def test_minify_text(self):
+        self.assertEqual("plain text", minify_text("plain text"))
+        self.assertEqual(" a b ", minify_text("\n a \t b  "))
+
+    def test_minifying_writer(self):
+        fragments = ["<p>", "a  b ", " c", "</p>", "<pre>", "<code>",
+                     "  x\n  y", "</code>", "</pre>", "\n\n z",
+                     '<img alt="two  spaces">']
+        out = StringIO()
+        writer = MinifyingWriter(out)
+
+        for fragment in fragments:
+            writer.write(fragment)
+
+        self.assertEqual('<p>a b c</p><pre><code>  x\n  y</code></pre> z'
+                         '<img alt="two  spaces">', out.getvalue())
+
+    def test_minify_css(self):
+        css = ("/* comment */\nbody {\n  color : red;\n  margin: 0 auto;\n}"
+               "\n\na:hover, a > b {\n  content: \"  keep  \";\n}\n"
+               "div :first-child { width: calc(1px + 2px); }\n")
+
+        self.assertEqual('body{color :red;margin:0 auto}a:hover,a>b'
+                         '{content:"  keep  "}div :first-child'
+                         '{width:calc(1px + 2px)}',
+                         minify_css(css))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,20 @@
 import unittest
+from io import StringIO
 
 from leafnode import LeafNode
 from parentnode import ParentNode
 
 
+class RecordingWriter(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, fragment):
+        self.writes.append(fragment)
+        return super().write(fragment)
+
+
 class TestLeafNode(unittest.TestCase):
     def test_init(self):
         node = ParentNode("p", [LeafNode("b", "text")], None)
@@ -44,6 +55,31 @@ class TestLeafNode(unittest.TestCase):
                           '<a prop="value">text</a></p>'),
                          node.to_html())
 
+    def test_write_html(self):
+        node = ParentNode("p",
+                          [
+                              ParentNode(
+                                  "span", [LeafNode("b", "text")], None),
+                              LeafNode(None, "tail")
+                          ],
+                          None)
+        fragments = []
+        node.write_html(fragments.append)
+        self.assertEqual(["<p>", "<span>", "<b>", "text", "</b>", "</span>",
+                          "tail", "</p>"], fragments)
+
+    def test_render_to(self):
+        node = ParentNode("p", [LeafNode("b", "text")], None)
+        buffer = RecordingWriter()
+        node.render_to(buffer)
+        self.assertEqual(node.to_html(), buffer.getvalue())
+        self.assertEqual(["<p>", "<b>", "text", "</b>", "</p>"],
+                         buffer.writes)
+
+    def test_error_render_to_no_children(self):
+        node = ParentNode("p", None, None)
+        self.assertRaises(ValueError, node.render_to, StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
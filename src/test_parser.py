@@ -1,8 +1,9 @@
 import unittest
 from parser import (BlockType, block_to_block_type, extract_markdown_images,
-                    extract_markdown_links, markdown_to_blocks, markdown_to_html_node,
-                    split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_children,
-                    text_to_textnodes)
+                    extract_markdown_links, iter_markdown_blocks,
+                    markdown_lines_to_html_node, markdown_to_blocks, markdown_to_html_node,
+                    scan_inline, split_nodes_delimiter, split_nodes_image, split_nodes_link,
+                    split_text_to_textnodes, text_to_children, text_to_textnodes)
 
 from textnode import TextNode, TextType
 
@@ -23,6 +24,32 @@ class TestParser(unittest.TestCase):
 
         self.assertEqual(3, len(blocks))
 
+    def test_markdown_to_block_fenced_code(self):
+        markdown = ("# Title\n\n```\nfirst\n\n\nsecond\n```\n\n"
+                    "inline ```x``` code\n\n\n\nlast")
+
+        blocks = markdown_to_blocks(markdown)
+
+        self.assertEqual(["# Title", "```\nfirst\n\n\nsecond\n```",
+                          "inline ```x``` code", "last"], blocks)
+        self.assertEqual(BlockType.CODE, block_to_block_type(blocks[1]))
+
+    def test_iter_markdown_blocks(self):
+        markdown = "\n\n# Title\n\n\n  para\none  \n \n\n* a\n* b\n"
+
+        self.assertEqual(["# Title", "para\none", "* a\n* b"],
+                         list(iter_markdown_blocks(
+                             markdown.splitlines(keepends=True))))
+        self.assertEqual(markdown_to_blocks(markdown),
+                         list(iter_markdown_blocks(markdown.split("\n"))))
+
+    def test_markdown_lines_to_html_node(self):
+        markdown = "# Title\n\n```\na\n\nb\n```\n\n* **x**\n"
+        node = markdown_lines_to_html_node(iter(markdown.splitlines(True)))
+
+        self.assertEqual(markdown_to_html_node(markdown).to_html(),
+                         node.to_html())
+
     def test_block_to_block_type_heading(self):
         block = "### titulo"
 
@@ -68,6 +95,16 @@ class TestParser(unittest.TestCase):
         res4 = block_to_block_type(block4)
         self.assertEqual(BlockType.PARAGRAPH, res4)
 
+    def test_block_to_block_type_first_character(self):
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(""))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("####### x"))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("``````"))
+        self.assertEqual(BlockType.CODE, block_to_block_type("```x```\n"))
+        self.assertEqual(BlockType.QUOTE, block_to_block_type(">"))
+        self.assertEqual(BlockType.UNORDERED_LIST, block_to_block_type("-\tx"))
+        self.assertEqual(BlockType.ORDERED_LIST, block_to_block_type("12. x"))
+        self.assertEqual(BlockType.PARAGRAPH, block_to_block_type("12 x"))
+
     def test_split_nodes_delimiter(self):
         node1 = TextNode(
             "This is text with a `code block 1` word`code block 2`",
@@ -142,6 +179,25 @@ class TestParser(unittest.TestCase):
 
         self.assertEqual(10, len(nodes))
 
+    def test_scan_inline_matches_split_passes(self):
+        texts = ["plain text",
+                 "",
+                 "**bold** at the start",
+                 "**a** and **b**",
+                 "***a** and *b*",
+                 "`code` with *italic* and **bold `tick`**",
+                 "**see ![image](/a.png)** and [link](/b)",
+                 "!![image](/a.png)[link](/b) [not a link]",
+                 "[a](http://x.com/*b*) and *c*"]
+
+        for text in texts:
+            self.assertEqual(split_text_to_textnodes(text), scan_inline(text))
+
+    def test_scan_inline_invalid_markdown(self):
+        for text in ["**open", "*open", "`open", "`a *b* c`", "*a **b** c*"]:
+            self.assertRaises(Exception, split_text_to_textnodes, text)
+            self.assertRaises(Exception, scan_inline, text)
+
     def test_text_to_children(self):
         text = ("This is **text** with an *italic* word and a "
                 "`code block` and an ![obi wan image](https://i.imgur.com/"
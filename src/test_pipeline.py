@@ -0,0 +1,61 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import sleep
+
+from pipeline import BoundedWriter, prefetch
+
+
+class TestPipeline(unittest.TestCase):
+    def test_prefetch_keeps_order(self):
+        def slow_square(n):
+            sleep(0.001 * (n % 3))
+            return n * n
+
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual([(n, n * n) for n in range(20)],
+                             list(prefetch(executor, slow_square, range(20),
+                                           3)))
+
+    def test_prefetch_is_bounded(self):
+        submitted = []
+
+        with ThreadPoolExecutor(2) as executor:
+            results = prefetch(executor, submitted.append, range(10), 3)
+            next(results)
+
+            self.assertEqual(3, len(submitted))
+
+    def test_bounded_writer(self):
+        written = []
+        lock = Lock()
+
+        def write(n):
+            with lock:
+                written.append(n)
+
+        with ThreadPoolExecutor(2) as executor:
+            writer = BoundedWriter(executor, 2)
+
+            for n in range(10):
+                writer.submit(write, n)
+                self.assertLessEqual(len(writer.pending), 2)
+
+            writer.drain()
+
+        self.assertEqual(list(range(10)), sorted(written))
+
+    def test_bounded_writer_raises(self):
+        def fail():
+            raise OSError("disk full")
+
+        with ThreadPoolExecutor(1) as executor:
+            writer = BoundedWriter(executor, 4)
+            writer.submit(fail)
+
+            with self.assertRaises(OSError):
+                writer.drain()
+
+
+if __name__ == "__main__":
+    unittest.main()
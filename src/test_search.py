@@ -0,0 +1,106 @@
+import json
+import unittest
+from os import listdir, path
+from tempfile import TemporaryDirectory
+
+from parser import markdown_to_html_node
+from search import SearchIndex, shard_name, term_frequencies, tokenize
+from testutil import write
+
+
+def read(file_path):
+    with open(file_path, 'r') as f:
+        return f.read()
+
+
+def read_json(file_path):
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+class TestSearch(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(["hello", "world", "42", "über"],
+                         tokenize("Hello, *world*! 42 a Über"))
+
+    def test_term_frequencies(self):
+        node = markdown_to_html_node(
+            "# Rings\n\n* **one** ring\n* [two rings](/rings)\n\n"
+            "![a ring image](/ring.png)")
+
+        self.assertEqual({"rings": 2, "one": 1, "ring": 2, "two": 1,
+                          "image": 1}, term_frequencies(node))
+
+    def test_shard_name(self):
+        self.assertEqual("r", shard_name("ring"))
+        self.assertEqual("4", shard_name("42"))
+        self.assertEqual("_", shard_name("über"))
+        self.assertEqual("_", shard_name("_x"))
+
+    def test_write_shards(self):
+        with TemporaryDirectory() as tmp:
+            index_dir = path.join(tmp, "search")
+            index = SearchIndex(path.join(tmp, "state.json"), "v1")
+            index.update("a.md", "1", "/a", "A", {"ring": 2, "one": 1})
+            index.update("b.md", "2", "/b", "B", {"ring": 1})
+
+            index.write(index_dir)
+
+            self.assertEqual(["index.json", "o.json", "r.json"],
+                             sorted(listdir(index_dir)))
+            self.assertEqual({"pages": [["/a", "A"], ["/b", "B"]],
+                              "shards": ["o", "r"]},
+                             read_json(path.join(index_dir, "index.json")))
+            self.assertEqual({"ring": [[0, 2], [1, 1]]},
+                             read_json(path.join(index_dir, "r.json")))
+
+    def test_write_only_dirty_shards(self):
+        with TemporaryDirectory() as tmp:
+            index_dir = path.join(tmp, "search")
+            r_path = path.join(index_dir, "r.json")
+            index = SearchIndex(path.join(tmp, "state.json"), "v1")
+            index.update("a.md", "1", "/a", "A", {"ring": 2, "one": 1})
+            index.update("b.md", "2", "/b", "B", {"two": 1})
+            index.write(index_dir)
+            index.save()
+
+            write(r_path, "untouched")
+
+            index = SearchIndex(path.join(tmp, "state.json"), "v1")
+            index.update("a.md", "3", "/a", "A", {"ring": 2, "one": 3})
+            index.retain(["a.md"])
+            self.assertEqual({"o", "t"}, index.dirty)
+            self.assertEqual([path.join(index_dir, "o.json"), r_path,
+                              path.join(index_dir, "index.json")],
+                             index.write(index_dir))
+
+            self.assertEqual("untouched", read(r_path))
+            self.assertEqual({"one": [[0, 3]]},
+                             read_json(path.join(index_dir, "o.json")))
+            self.assertFalse(path.exists(path.join(index_dir, "t.json")))
+
+    def test_incremental(self):
+        with TemporaryDirectory() as tmp:
+            state = path.join(tmp, "state.json")
+            index = SearchIndex(state, "v1")
+            index.update("a.md", "1", "/a", "A", {"ring": 1})
+            index.update("b.md", "2", "/b", "B", {"one": 1})
+            index.update("c.md", "3", "/c", "C", {"two": 1})
+            index.save()
+
+            index = SearchIndex(state, "v1")
+            self.assertTrue(index.is_fresh("a.md", "1"))
+            self.assertFalse(index.is_fresh("a.md", "9"))
+            self.assertFalse(index.is_fresh("d.md", "4"))
+
+            index.retain(["a.md", "c.md"])
+            index.update("d.md", "4", "/d", "D", {"ring": 3})
+            self.assertEqual([["/a", "A"], ["/d", "D"], ["/c", "C"]],
+                             index.page_table())
+            self.assertEqual({"ring": [[0, 1], [1, 3]]}, index.shards()["r"])
+
+            self.assertEqual({}, SearchIndex(state, "v2").pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
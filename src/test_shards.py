@@ -0,0 +1,59 @@
+import unittest
+from os import makedirs, path
+from tempfile import TemporaryDirectory
+
+from shards import (find_shards, parse_shard, partition, read_shard_record,
+                    relocate, write_shard_record)
+
+
+class TestShards(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual((2, 4), parse_shard("2/4"))
+
+        for value in ["0/4", "5/4", "2", "a/b"]:
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_partition_balances_weight(self):
+        weights = {"a": 7, "b": 5, "c": 4, "d": 3, "e": 1}
+        shards = partition(list("edcba"), weights.get, 2)
+
+        self.assertEqual([["a", "d"], ["b", "c", "e"]], shards)
+        self.assertEqual(shards, partition(list("abcde"), weights.get, 2))
+        self.assertEqual([["a"], [], []], partition(["a"], weights.get, 3))
+
+    def test_find_shards(self):
+        with TemporaryDirectory() as tmp:
+            for name in ["1-of-2", "2-of-2", "other"]:
+                makedirs(path.join(tmp, name))
+
+            write_shard_record(path.join(tmp, "1-of-2"), {"a.html": {}})
+
+            with self.assertRaises(ValueError):
+                find_shards(tmp)
+
+            write_shard_record(path.join(tmp, "2-of-2"), {})
+            self.assertEqual([path.join(tmp, "1-of-2"),
+                              path.join(tmp, "2-of-2")], find_shards(tmp))
+            self.assertEqual({"a.html": {}},
+                             read_shard_record(path.join(tmp, "1-of-2")))
+
+            makedirs(path.join(tmp, "1-of-3"))
+
+            with self.assertRaises(ValueError):
+                find_shards(tmp)
+
+    def test_relocate(self):
+        shard = path.join(".", "shards", "1-of-2")
+        public = path.join(".", "public")
+
+        self.assertEqual(path.join(public, "asset-manifest.json"),
+                         relocate(path.join(shard, "asset-manifest.json"),
+                                  shard, public))
+        self.assertEqual(path.join(".", ".cache", "a.json"),
+                         relocate(path.join(".", ".cache", "a.json"),
+                                  shard, public))
+
+
+if __name__ == "__main__":
+    unittest.main()
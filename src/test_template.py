@@ -0,0 +1,103 @@
+import unittest
+from io import StringIO
+from os import path, utime
+from tempfile import TemporaryDirectory
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Markup, Template, compile_template, load_template
+from testutil import write
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_template(self):
+        segments = compile_template("<title>{{ Title }}</title>{{Content}}")
+
+        self.assertEqual([("<title>", None),
+                          ("{{ Title }}", "Title"),
+                          ("</title>", None),
+                          ("{{Content}}", "Content")], segments)
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}{{ Title }}")
+        content = ParentNode("p", [LeafNode("b", "text")])
+
+        self.assertEqual("<h1>T</h1><p><b>text</b></p>T",
+                         template.render({"Title": "T", "Content": content}))
+
+    def test_render_escapes_text(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}"
+                            "{{ author }}")
+        content = ParentNode("h1", [LeafNode(None, "Tom & <Jerry>")])
+
+        self.assertEqual("<title>Tom &amp; &lt;Jerry&gt;</title>"
+                         "<h1>Tom &amp; &lt;Jerry&gt;</h1>"
+                         "<b>bold</b>",
+                         template.render({"Title": "Tom & <Jerry>",
+                                          "Content": content,
+                                          "author": Markup("<b>bold</b>")}))
+
+    def test_render_rewrites_template_urls(self):
+        template = Template('<link href="/index.css">{{ Title }}')
+        urls = {"/index.css": "/index.abc.css"}
+
+        self.assertEqual('<link href="/index.abc.css">'
+                         'href="/index.css"',
+                         template.render({"Title": 'href="/index.css"'},
+                                         urls))
+        self.assertEqual('<link href="/index.css">',
+                         template.render({"Title": ""}))
+
+    def test_render_missing_variable(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Author }}")
+
+        self.assertEqual("<h1>T</h1>{{ Author }}",
+                         template.render({"Title": "T"}))
+
+    def test_render_arguments(self):
+        template = Template("{{ Pages tag=a limit=2 }}|{{ Pages }}")
+        segments = compile_template("{{ Pages tag=a }}")
+
+        self.assertEqual([("{{ Pages tag=a }}", "Pages")], segments)
+        self.assertEqual("[('limit', '2'), ('tag', 'a')]|[]",
+                         template.render({"Pages": lambda args: sorted(
+                             args.items())}))
+
+    def test_render_to(self):
+        template = Template("<p>{{ count }}</p>")
+        buffer = StringIO()
+        template.render_to(buffer, {"count": 3})
+
+        self.assertEqual("<p>3</p>", buffer.getvalue())
+
+    def test_render_minified(self):
+        template = Template("<main>\n    <h1>{{ Title }}</h1>\n"
+                            "    {{ Content }}\n</main>", minify=True)
+        content = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "a  lot   of space")]),
+            ParentNode("pre", [LeafNode("code", "x =  1")])])
+
+        self.assertEqual("<main><h1>T  itle</h1> <div><p>a lot of space</p>"
+                         "<pre><code>x =  1</code></pre></div> </main>",
+                         template.render({"Title": Markup("T  itle"),
+                                          "Content": content}))
+
+    def test_load_template_cache(self):
+        with TemporaryDirectory() as tmp:
+            template_path = path.join(tmp, "template.html")
+
+            write(template_path, "{{ Title }}")
+
+            template = load_template(template_path)
+            self.assertIs(template, load_template(template_path))
+
+            write(template_path, "<b>{{ Title }}</b>")
+            utime(template_path, ns=(0, 0))
+
+            reloaded = load_template(template_path)
+            self.assertIsNot(template, reloaded)
+            self.assertEqual(["Title"], reloaded.variables())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
-from textnode import (TextNode, TextType, text_node_to_html_node)
+from textnode import (TextNode, TextType, set_image_attributes,
+                      text_node_to_html_node)
 
 
 class TestTextNode(unittest.TestCase):
@@ -25,6 +26,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.ITALIC)
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_text_node_to_html_node_with_no_props(self):
         text_node = TextNode("text", TextType.BOLD)
         html_node = text_node_to_html_node(text_node)
@@ -40,6 +45,20 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual("text", html_node.value)
         self.assertEqual("link", html_node.props["href"])
 
+    def test_text_node_to_html_node_image_attributes(self):
+        set_image_attributes({"/a.png": {"width": "8", "height": "4",
+                                         "loading": "lazy"}})
+
+        try:
+            a = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/a.png"))
+            b = text_node_to_html_node(TextNode("b", TextType.IMAGE, "/b.png"))
+        finally:
+            set_image_attributes({})
+
+        self.assertEqual('<img src="/a.png" alt="a" width="8" height="4" '
+                         'loading="lazy"></img>', a.to_html())
+        self.assertEqual({"src": "/b.png", "alt": "b"}, b.props)
+
 
 if __name__ == "__main__":
     unittest.main()
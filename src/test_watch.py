@@ -0,0 +1,59 @@
+import unittest
+from os import path, remove
+from tempfile import TemporaryDirectory
+
+from testutil import write
+from watch import InotifyWatcher, PollingWatcher, create_watcher
+
+
+class TestWatch(unittest.TestCase):
+    def check_watcher(self, watcher_class):
+        with TemporaryDirectory() as tmp:
+            content = path.join(tmp, "content")
+            template = path.join(tmp, "template.html")
+            page = path.join(content, "index.md")
+            write(page, "# Home")
+            write(template, "{{ Content }}")
+            write(path.join(tmp, "ignored.txt"), "")
+
+            watcher = watcher_class([content, template])
+
+            try:
+                self.assertEqual(set(), watcher.poll(0))
+
+                write(page, "# Changed home")
+                self.assertEqual({page}, watcher.poll(1))
+
+                post = path.join(content, "blog", "post", "index.md")
+                write(post, "# Post")
+                self.assertIn(post, watcher.poll(1))
+
+                write(template, "<main>{{ Content }}</main>")
+                write(path.join(tmp, "ignored.txt"), "changed")
+                self.assertEqual({template}, watcher.poll(1))
+
+                remove(page)
+                self.assertEqual({page}, watcher.poll(1))
+            finally:
+                watcher.close()
+
+    def test_polling_watcher(self):
+        self.check_watcher(lambda roots: PollingWatcher(roots, 0.01))
+
+    def test_inotify_watcher(self):
+        try:
+            InotifyWatcher([]).close()
+        except (OSError, AttributeError, TypeError):
+            self.skipTest("inotify is not available")
+
+        self.check_watcher(InotifyWatcher)
+
+    def test_create_watcher(self):
+        with TemporaryDirectory() as tmp:
+            watcher = create_watcher([tmp])
+            self.assertEqual(set(), watcher.poll(0))
+            watcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,7 @@
+from os import makedirs, path
+
+
+def write(file_path, text=""):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(text)
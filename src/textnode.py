@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Dict
 
 from leafnode import LeafNode
 
 
+image_attributes: Dict[str, Dict[str, str]] = {}
+
+
+def set_image_attributes(attributes: Dict[str, Dict[str, str]]):
+    global image_attributes
+    image_attributes = attributes
+
+
 class TextType(Enum):
     TEXT = "text"
     BOLD = "bold"
@@ -15,6 +24,8 @@ class TextType(Enum):
 
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
         self.text_type = text_type
@@ -42,7 +53,9 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.LINK:
             return LeafNode("a", text_node.text, {"href": text_node.url})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url,
-                                        "alt": text_node.text})
+            props = {"src": text_node.url, "alt": text_node.text}
+            props.update(image_attributes.get(text_node.url, ()))
+
+            return LeafNode("img", "", props)
         case _:
             raise TypeError()
@@ -0,0 +1,175 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from os import path
+from typing import Dict, Iterable, Set, Tuple
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE)
+
+_EVENT = struct.Struct("iIII")
+
+
+def walk_files(root: str) -> Iterable[str]:
+    if path.isfile(root):
+        yield root
+        return
+
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            yield path.join(dir_path, name)
+
+
+class PollingWatcher():
+    def __init__(self, roots: Iterable[str], interval: float = 0.05):
+        self.roots = list(roots)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+
+        for root in self.roots:
+            for file_path in walk_files(root):
+                try:
+                    st = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+
+                snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+
+        return snapshot
+
+    def poll(self, timeout: float = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot = self._scan()
+            changed = {p for p in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(p) != self._snapshot.get(p)}
+            self._snapshot = snapshot
+
+            if changed:
+                return changed
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher():
+    def __init__(self, roots: Iterable[str], settle: float = 0.01):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                    ctypes.c_uint32]
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.roots = list(roots)
+        self.settle = settle
+        self._dirs: Dict[int, str] = {}
+        self._files: Dict[int, Set[str]] = {}
+
+        for root in self.roots:
+            if path.isdir(root):
+                self._watch_tree(root)
+            else:
+                self._watch_file(root)
+
+    def _watch(self, dir_path: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {dir_path}")
+
+        self._dirs[wd] = dir_path
+
+        return wd
+
+    def _watch_tree(self, root: str):
+        for dir_path, _, _ in os.walk(root):
+            self._files.pop(self._watch(dir_path), None)
+
+    def _watch_file(self, file_path: str):
+        wd = self._watch(path.dirname(file_path) or ".")
+        self._files.setdefault(wd, set()).add(path.basename(file_path))
+
+    def _read_events(self, changed: Set[str]):
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return
+
+            offset = 0
+
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset+length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    for root in self.roots:
+                        changed.update(walk_files(root))
+                    continue
+
+                dir_path = self._dirs.get(wd)
+
+                if dir_path is None or not name:
+                    continue
+
+                names = self._files.get(wd)
+
+                if names is not None and name not in names:
+                    continue
+
+                event_path = path.join(dir_path, name)
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(event_path)
+                    changed.update(walk_files(event_path))
+                else:
+                    changed.add(event_path)
+
+    def poll(self, timeout: float = None) -> Set[str]:
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+
+        while readable:
+            self._read_events(changed)
+            readable, _, _ = select.select([self.fd], [], [], self.settle)
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(roots: Iterable[str]):
+    roots = list(roots)
+
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(roots)